@@ -0,0 +1,56 @@
+from django.core.cache import caches
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+# per process LRU with a TTL, see CACHES["auth"]
+auth_cache = caches["auth"]
+
+
+def user_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def subjects_key(user_id):
+    return f"auth:subjects:{user_id}"
+
+
+def invalidate_user(user_id):
+    # the subject set goes too: a recreated user id must not inherit it
+    auth_cache.delete_many([user_key(user_id), subjects_key(user_id)])
+
+
+def check_cached_user(validated_token, user):
+    # the checks JWTAuthentication.get_user runs after its lookup
+    if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed("User is inactive", code="user_inactive")
+    if api_settings.CHECK_REVOKE_TOKEN and (
+        validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+    ):
+        raise AuthenticationFailed("The user's password has been changed.", code="password_changed")
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps resolved users in the per process auth
+    cache, so repeat requests skip the user primary key lookup.
+
+    Entries are dropped when the user is saved or deleted and when one of
+    their refresh tokens is blacklisted (logout), see accounts.signals;
+    other processes pick the change up within AUTH_CACHE_TTL.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        user = auth_cache.get(user_key(user_id))
+        if user is not None:
+            return check_cached_user(validated_token, user)
+
+        user = super().get_user(validated_token)
+        auth_cache.set(user_key(user_id), user)
+        return user
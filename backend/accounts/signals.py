@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .authentication import invalidate_user
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    # password, is_active or profile changes must not be served from the cache
+    invalidate_user(instance.id)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def drop_cached_user_on_logout(sender, instance, created, **kwargs):
+    if created and instance.token.user_id is not None:
+        invalidate_user(instance.token.user_id)
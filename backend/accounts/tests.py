@@ -1,3 +1,70 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from subjects.models import Subject
+
+User = get_user_model()
+
+
+class CachedAuthenticationTests(APITestCase):
+    def setUp(self):
+        caches["auth"].clear()
+        self.user = User.objects.create_user(
+            username="student", password="pass12345", id_card_number="ID001"
+        )
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.refresh.access_token}")
+        self.subject = Subject.objects.create(subject_name="DBMS", owner=self.user)
+
+    def test_user_and_subjects_cached_between_requests(self):
+        url = reverse("subject-timetable", args=[self.subject.id])
+        # user + subject ids + the timetable itself (version and rows)
+        with self.assertNumQueries(4):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_new_and_deleted_subjects_are_seen(self):
+        self.client.get(reverse("subject-timetable", args=[self.subject.id]))
+
+        created = self.client.post(reverse("subject-list"), {"subject_name": "OS"}).json()
+        url = reverse("subject-timetable", args=[created["id"]])
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.client.delete(reverse("subject-detail", args=[created["id"]]))
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_subjects_changed_by_another_worker_are_seen(self):
+        from accounts.authentication import subjects_key
+        from subjects.ownership import owned_subject_ids
+
+        owned_subject_ids(self.user.id)
+        # bulk_create sends no signals, like a create handled by another worker
+        [other] = Subject.objects.bulk_create([Subject(subject_name="OS", owner=self.user)])
+        url = reverse("subject-timetable", args=[other.id])
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        # a subject deleted elsewhere while this worker still lists it
+        caches["auth"].set(subjects_key(self.user.id), frozenset({self.subject.id, other.id, 999}))
+        response = self.client.post(
+            reverse("mark-attendance"), {"subject": 999, "date": "2026-01-05", "status": "PRESENT"}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_logout_and_deactivation_drop_the_cached_user(self):
+        from accounts.authentication import user_key
+
+        self.client.get(reverse("subject-list"))
+        self.assertIsNotNone(caches["auth"].get(user_key(self.user.id)))
+
+        response = self.client.post(reverse("logout"), {"refresh": str(self.refresh)})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(caches["auth"].get(user_key(self.user.id)))
+
+        self.client.get(reverse("subject-list"))
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse("subject-list")).status_code, 401)
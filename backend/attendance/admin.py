@@ -1,4 +1,77 @@
 from django.contrib import admin
-from .models import Attendance
+from django.db import transaction
+from django.utils import timezone
+from .cache import invalidate_stats
+from .counters import apply_status_changes
+from .models import Attendance, SubjectAttendanceCounter
+from .sync import record_deletions
 
-admin.site.register(Attendance)
+
+@admin.register(Attendance)
+class AttendanceAdmin(admin.ModelAdmin):
+    """
+    Admin edits go through the same counter, cache and tombstone updates as
+    the API, so they cannot desync the materialized counters.
+    """
+
+    list_display = ("subject", "date", "status", "updated_at")
+    readonly_fields = ("changed_at",)
+    list_filter = ("status",)
+
+    @transaction.atomic
+    def save_model(self, request, obj, form, change):
+        old = None
+        if change:
+            old = (
+                Attendance.objects.select_for_update()
+                .filter(pk=obj.pk)
+                .values_list("subject_id", "date", "status", "subject__owner_id")
+                .first()
+            )
+        obj.changed_at = timezone.now()
+        super().save_model(request, obj, form, change)
+
+        changes = [(obj.subject_id, None, obj.status)]
+        if old:
+            old_subject, old_date, old_status, old_owner = old
+            changes.append((old_subject, old_status, None))
+            if (old_subject, old_date) != (obj.subject_id, obj.date):
+                record_deletions([(old_subject, old_date)])
+            invalidate_stats(old_owner, [old_subject], dates=[old_date])
+        apply_status_changes(changes)
+        invalidate_stats(obj.subject.owner_id, [obj.subject_id], dates=[obj.date])
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, Attendance.objects.filter(pk=obj.pk))
+
+    @transaction.atomic
+    def delete_queryset(self, request, queryset):
+        removed = list(
+            queryset.select_for_update(of=("self",)).values_list(
+                "subject_id", "date", "status", "subject__owner_id"
+            )
+        )
+        queryset.delete()
+        record_deletions([(subject_id, day) for subject_id, day, _, _ in removed])
+        apply_status_changes((subject_id, old_status, None) for subject_id, _, old_status, _ in removed)
+        for subject_id, day, _, owner_id in removed:
+            invalidate_stats(owner_id, [subject_id], dates=[day])
+
+
+@admin.register(SubjectAttendanceCounter)
+class SubjectAttendanceCounterAdmin(admin.ModelAdmin):
+    """
+    Read only: the counters are derived from the attendance rows. Repair
+    them with python manage.py rebuild_attendance_counters.
+    """
+
+    list_display = ("subject", "present", "absent", "no_class")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
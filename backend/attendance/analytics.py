@@ -0,0 +1,227 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.functions import ExtractWeekDay, TruncMonth, TruncWeek
+
+from .cache import history_version, open_period_start
+from .models import Attendance
+from .utils import build_stats, status_counts
+from subjects.models import Subject
+
+# ExtractWeekDay numbers the days 1 (Sunday) to 7 (Saturday) on every backend
+WEEKDAY_CODES = {1: "SUN", 2: "MON", 3: "TUE", 4: "WED", 5: "THU", 6: "FRI", 7: "SAT"}
+WEEKDAY_ORDER = ["MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"]
+
+# key used for the overall (all subjects) streak
+OVERALL = 0
+
+# Gaps and islands over (mark_key, mark_date, mark_status) rows: consecutive
+# PRESENT marks of a key share the same difference of the two row numbers.
+# Per key it returns the longest run, the run at the end (current streak),
+# the run at the start and the number of marks, which is enough to merge the
+# summary of a closed range with the one of the open range after it.
+STREAKS_SQL = """
+WITH marks AS ({marks}),
+islands AS (
+    SELECT mark_key, mark_date, mark_status,
+           ROW_NUMBER() OVER (PARTITION BY mark_key ORDER BY mark_date)
+           - ROW_NUMBER() OVER (PARTITION BY mark_key, mark_status ORDER BY mark_date) AS island
+    FROM marks
+),
+runs AS (
+    SELECT mark_key, COUNT(*) AS length, MIN(mark_date) AS first_date, MAX(mark_date) AS last_date
+    FROM islands
+    WHERE mark_status = %s
+    GROUP BY mark_key, island
+),
+bounds AS (
+    SELECT mark_key, COUNT(*) AS marks, MIN(mark_date) AS first_date, MAX(mark_date) AS last_date
+    FROM marks
+    GROUP BY mark_key
+)
+SELECT bounds.mark_key,
+       COALESCE(MAX(runs.length), 0),
+       COALESCE(MAX(CASE WHEN runs.last_date = bounds.last_date THEN runs.length END), 0),
+       COALESCE(MAX(CASE WHEN runs.first_date = bounds.first_date THEN runs.length END), 0),
+       bounds.marks
+FROM bounds LEFT JOIN runs ON runs.mark_key = bounds.mark_key
+GROUP BY bounds.mark_key, bounds.marks
+"""
+
+
+def analytics_key(user_id, start, end, subject_id, boundary):
+    return (
+        f"attendance:analytics:{user_id}:{history_version(user_id)}:"
+        f"{start}:{end}:{subject_id}:{boundary}"
+    )
+
+
+def _counts(row):
+    return (row["present"], row["absent"], row["no_class"])
+
+
+def _add(target, key, counts):
+    current = target.get(key, (0, 0, 0))
+    target[key] = tuple(a + b for a, b in zip(current, counts))
+
+
+def _streak_rows(marks):
+    sql, params = marks.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(STREAKS_SQL.format(marks=sql), (*params, Attendance.Status.PRESENT))
+        return {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+
+
+def summarize(records):
+    """
+    Additive summary of a filtered Attendance queryset, all computed in the
+    database (five grouped queries, no attendance rows are loaded):
+    counts per (subject, week), (subject, month) and (subject, weekday) and
+    streak summaries per subject and for the whole user.
+    """
+    records = records.order_by()
+    summary = {"weekly": {}, "monthly": {}, "weekday": {}, "streaks": {}}
+
+    buckets = [
+        ("weekly", TruncWeek("date")),
+        ("monthly", TruncMonth("date")),
+        ("weekday", ExtractWeekDay("date")),
+    ]
+    for name, bucket in buckets:
+        rows = records.annotate(bucket=bucket).values("subject_id", "bucket").annotate(**status_counts())
+        for row in rows:
+            _add(summary[name], (row["subject_id"], row["bucket"]), _counts(row))
+
+    counted = records.filter(status__in=[Attendance.Status.PRESENT, Attendance.Status.ABSENT])
+    summary["streaks"].update(_streak_rows(
+        counted.values(mark_key=F("subject_id"), mark_date=F("date"), mark_status=F("status"))
+    ))
+    # overall a day counts as present when no class of that day was missed
+    days = (
+        counted.values(mark_date=F("date"))
+        .annotate(absences=Count("id", filter=Q(status=Attendance.Status.ABSENT)))
+        .annotate(
+            mark_key=Value(OVERALL),
+            mark_status=Case(
+                When(absences__gt=0, then=Value(Attendance.Status.ABSENT.value)),
+                default=Value(Attendance.Status.PRESENT.value),
+            ),
+        )
+        .values("mark_key", "mark_date", "mark_status")
+    )
+    summary["streaks"].update({
+        ("overall", key): value for key, value in _streak_rows(days).items()
+    })
+    return summary
+
+
+def merge_streaks(first, second):
+    # (longest, current, leading, marks) of two consecutive ranges
+    if not first or not first[3]:
+        return second
+    if not second or not second[3]:
+        return first
+    longest = max(first[0], second[0], first[1] + second[2])
+    current = second[1] + (first[1] if second[2] == second[3] else 0)
+    leading = first[2] + (second[2] if first[2] == first[3] else 0)
+    return (longest, current, leading, first[3] + second[3])
+
+
+def merge(closed, open_):
+    merged = {"weekly": {}, "monthly": {}, "weekday": {}, "streaks": {}}
+    for part in (closed, open_):
+        for name in ("weekly", "monthly", "weekday"):
+            for key, counts in part[name].items():
+                _add(merged[name], key, counts)
+    for key in closed["streaks"].keys() | open_["streaks"].keys():
+        merged["streaks"][key] = merge_streaks(closed["streaks"].get(key), open_["streaks"].get(key))
+    return merged
+
+
+def _series(buckets, subject_id, label):
+    # buckets of one subject (None = all subjects) as a sorted list
+    totals = {}
+    for (sid, bucket), counts in buckets.items():
+        if subject_id is None or sid == subject_id:
+            _add(totals, bucket, counts)
+    return [
+        {label: bucket.isoformat()[:10] if hasattr(bucket, "isoformat") else bucket, **build_stats(*counts)}
+        for bucket, counts in sorted(totals.items())
+    ]
+
+
+def _weekday_pattern(buckets, subject_id):
+    totals = {}
+    for (sid, weekday), counts in buckets.items():
+        if subject_id is None or sid == subject_id:
+            _add(totals, WEEKDAY_CODES[weekday], counts)
+    pattern = []
+    for day in WEEKDAY_ORDER:
+        present, absent, no_class = totals.get(day, (0, 0, 0))
+        total = present + absent
+        pattern.append({
+            "day": day,
+            "present": present,
+            "absent": absent,
+            "no_class": no_class,
+            "absence_rate": round(absent / total * 100, 2) if total else 0,
+        })
+    return pattern
+
+
+def _streaks(summary):
+    longest, current, _, _ = summary or (0, 0, 0, 0)
+    return {"current": current, "longest": longest}
+
+
+def _report(summary, subject_id, streak_key):
+    return {
+        "weekly": _series(summary["weekly"], subject_id, "week"),
+        "monthly": [
+            {**row, "month": row["month"][:7]}
+            for row in _series(summary["monthly"], subject_id, "month")
+        ],
+        "weekday": _weekday_pattern(summary["weekday"], subject_id),
+        "streaks": _streaks(summary["streaks"].get(streak_key)),
+    }
+
+
+def build_analytics(user, start=None, end=None, subject_id=None, today=None):
+    """
+    Weekly and monthly trends, weekday absence patterns and present streaks,
+    per subject and overall, for the user's marks in [start, end].
+
+    Periods that ended before the open period (see open_period_start) are
+    summarized once and cached until a mark before it changes; every call
+    only aggregates the open period and merges it in.
+    """
+    boundary = open_period_start(today)
+    records = Attendance.objects.filter(subject__owner=user)
+    if subject_id is not None:
+        records = records.filter(subject_id=subject_id)
+    if start:
+        records = records.filter(date__gte=start)
+    if end:
+        records = records.filter(date__lte=end)
+
+    key = analytics_key(user.id, start, end, subject_id, boundary)
+    closed = cache.get(key)
+    if closed is None:
+        closed = summarize(records.filter(date__lt=boundary))
+        cache.set(key, closed, timeout=settings.CACHE_TTL)
+    summary = merge(closed, summarize(records.filter(date__gte=boundary)))
+
+    subjects = Subject.objects.filter(owner=user).order_by("subject_name")
+    if subject_id is not None:
+        subjects = subjects.filter(id=subject_id)
+
+    return {
+        "from": start.isoformat() if start else None,
+        "to": end.isoformat() if end else None,
+        "overall": _report(summary, None, ("overall", OVERALL)),
+        "subjects": [
+            {"subject": sid, "subject_name": name, **_report(summary, sid, sid)}
+            for sid, name in subjects.values_list("id", "subject_name")
+        ],
+    }
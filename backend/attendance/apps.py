@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class AttendanceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'attendance'
+
+    def ready(self):
+        from django.core import checks
+
+        from . import signals  # noqa: F401
+        from backend.db_routing import check_shared_cache
+
+        checks.register(check_shared_cache, checks.Tags.caches)
@@ -0,0 +1,93 @@
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Q
+
+from .counters import apply_status_changes, rebuild_counters
+from .models import Attendance
+
+CREATED = "created"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+
+def pairs_filter(pairs):
+    # exactly these (subject_id, date) pairs, not the cross product of both sets
+    return reduce(or_, (Q(subject_id=subject_id, date=day) for subject_id, day in pairs))
+
+
+def lock_marks(pairs, *fields):
+    """
+    Lock the existing marks of (subject_id, date) pairs and return
+    {pair: (status, *fields)}. Must run inside a transaction.
+    """
+    return {
+        (subject_id, day): tuple(values)
+        for subject_id, day, *values in Attendance.objects.select_for_update()
+        .filter(pairs_filter(pairs))
+        .order_by()
+        .values_list("subject_id", "date", "status", *fields)
+    }
+
+
+def raced_subjects(created):
+    """
+    Subjects of marks we wrote as new that another request inserted first.
+    The locking read cannot see rows inserted but not yet committed, so the
+    upsert turned our insert into an update of that row and the old status
+    we counted (None) is wrong; the caller recounts those subjects.
+    created are the instances passed to the upsert (created_at is set on them).
+    """
+    if not created:
+        return set()
+    ours = {(row.subject_id, row.date): row.created_at for row in created}
+    return {
+        subject_id
+        for subject_id, day, created_at in Attendance.objects.filter(pairs_filter(ours))
+        .order_by()
+        .values_list("subject_id", "date", "created_at")
+        if created_at != ours[(subject_id, day)]
+    }
+
+
+def upsert_attendance(marks):
+    """
+    Write many (subject_id, date, status) marks with one locking read of the
+    exact pairs and one bulk upsert, keeping the counters in sync.
+    marks must already be validated, owned by the caller and unique per
+    (subject_id, date). Returns {(subject_id, date): CREATED | UPDATED | UNCHANGED}.
+    """
+    if not marks:
+        return {}
+
+    with transaction.atomic():
+        existing = lock_marks([(subject_id, day) for subject_id, day, _ in marks])
+
+        results = {}
+        to_write = []
+        changes = []
+        for subject_id, day, status_value in marks:
+            key = (subject_id, day)
+            old_status = existing[key][0] if key in existing else None
+            if old_status == status_value:
+                results[key] = UNCHANGED
+                continue
+
+            results[key] = CREATED if old_status is None else UPDATED
+            to_write.append(Attendance(subject_id=subject_id, date=day, status=status_value))
+            changes.append((subject_id, old_status, status_value))
+
+        if to_write:
+            # updated_at is written too: the change feed and ETags read it
+            Attendance.objects.bulk_create(
+                to_write,
+                update_conflicts=True,
+                unique_fields=["subject", "date"],
+                update_fields=["status", "changed_at", "updated_at"],
+            )
+            apply_status_changes(changes)
+            raced = raced_subjects([row for row in to_write if results[(row.subject_id, row.date)] == CREATED])
+            if raced:
+                rebuild_counters(raced)
+
+    return results
@@ -0,0 +1,102 @@
+import datetime
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+HITS_KEY = "attendance:stats:hits"
+MISSES_KEY = "attendance:stats:misses"
+
+
+def overall_key(user_id):
+    return f"attendance:stats:{user_id}:overall"
+
+
+def subject_key(user_id, subject_id):
+    return f"attendance:stats:{user_id}:subject:{subject_id}"
+
+
+def _count(key):
+    # add() is a no-op when the key exists, so incr() never hits a missing key
+    # unless it was evicted in between; a lost tick is fine for a hit rate
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def get_or_compute(key, compute):
+    """
+    Return the cached value for key, computing and storing it on a miss.
+    compute may return None (e.g. subject not found); that is not cached.
+    """
+    value = cache.get(key)
+    if value is not None:
+        _count(HITS_KEY)
+        return value
+
+    _count(MISSES_KEY)
+    value = compute()
+    if value is not None:
+        cache.set(key, value, timeout=settings.CACHE_TTL)
+    return value
+
+
+def history_key(user_id):
+    return f"attendance:analytics:{user_id}:history"
+
+
+def open_period_start(today=None):
+    """
+    First day that still belongs to an open analytics period: the earlier of
+    this week's Monday and the 1st of this month. Everything before it is
+    closed and can be cached until someone edits the past.
+    """
+    today = today or timezone.localdate()
+    return min(today - datetime.timedelta(days=today.weekday()), today.replace(day=1))
+
+
+def history_version(user_id):
+    """
+    Token that changes whenever closed periods of the user change. A random
+    value rather than a counter, so an evicted key can never come back as
+    a version that was used before.
+    """
+    key = history_key(user_id)
+    cache.add(key, uuid.uuid4().hex, timeout=None)
+    return cache.get(key) or ""
+
+
+def invalidate_stats(user_id, subject_ids=(), dates=None):
+    """
+    Drop the overall stats of a user and the stats of the given subjects.
+    Runs after the surrounding transaction commits so a concurrent read
+    cannot re-cache the old numbers.
+
+    dates are the attendance dates that were written, when known; the
+    cached closed analytics periods are only dropped when one of them is
+    before the open period (None means unknown, so they are dropped).
+    """
+    keys = [overall_key(user_id)] + [subject_key(user_id, sid) for sid in subject_ids]
+    history_changed = dates is None or any(day < open_period_start() for day in dates)
+
+    def drop():
+        cache.delete_many(keys)
+        if history_changed:
+            cache.set(history_key(user_id), uuid.uuid4().hex, timeout=None)
+
+    transaction.on_commit(drop)
+
+
+def cache_counters():
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0,
+    }
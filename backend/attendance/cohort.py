@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.functions import Coalesce
+
+from .models import Attendance
+from .utils import status_counts
+from subjects.models import Subject
+
+User = get_user_model()
+
+COHORT_COLUMNS = [
+    "user_id", "username", "id_card_number", "subject_id", "subject_name",
+    "present", "absent", "total", "percentage",
+]
+
+IDENTITY = {
+    "user_id": F("subject__owner_id"),
+    "username": F("subject__owner__username"),
+    "id_card_number": F("subject__owner__id_card_number"),
+    "subject_name": F("subject__subject_name"),
+}
+
+
+def _below(rows, threshold, min_classes):
+    # present / total < threshold %, compared in integers inside the database
+    return (
+        rows.annotate(total=F("present") + F("absent"), scaled=F("present") * 100)
+        .filter(total__gte=min_classes, scaled__lt=F("total") * threshold)
+        .order_by("user_id", "subject_name")
+    )
+
+
+def _from_counters(first_id, last_id):
+    # all-time totals: a join against the materialized counters, no grouping
+    return Subject.objects.filter(owner__id__range=(first_id, last_id)).values(
+        "subject_name",
+        subject_id=F("id"),
+        user_id=F("owner_id"),
+        username=F("owner__username"),
+        id_card_number=F("owner__id_card_number"),
+    ).annotate(
+        present=Coalesce(F("attendance_counter__present"), 0),
+        absent=Coalesce(F("attendance_counter__absent"), 0),
+    )
+
+
+def _from_records(first_id, last_id, start, end):
+    # a date range needs the raw rows: one GROUP BY subject over the range
+    records = Attendance.objects.filter(subject__owner__id__range=(first_id, last_id))
+    if start:
+        records = records.filter(date__gte=start)
+    if end:
+        records = records.filter(date__lte=end)
+    return records.order_by().values("subject_id", **IDENTITY).annotate(**status_counts())
+
+
+def cohort_rows(threshold=75, start=None, end=None, min_classes=1, chunk_size=1000):
+    """
+    Yield one COHORT_COLUMNS tuple per (user, subject) whose attendance is
+    below threshold percent, for every user, ordered by user id.
+
+    Users are walked in id ranges of chunk_size; each range is a single
+    query that filters in the database, so memory holds one range of
+    result rows and the database never sorts the whole population.
+    """
+    last_user_id = 0
+    while True:
+        user_ids = list(
+            User.objects.filter(id__gt=last_user_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:chunk_size]
+        )
+        if not user_ids:
+            return
+        first_id, last_user_id = user_ids[0], user_ids[-1]
+
+        if start or end:
+            rows = _from_records(first_id, last_user_id, start, end)
+        else:
+            rows = _from_counters(first_id, last_user_id)
+
+        for row in _below(rows, threshold, min_classes).iterator(chunk_size=2000):
+            yield (
+                row["user_id"],
+                row["username"],
+                row["id_card_number"],
+                row["subject_id"],
+                row["subject_name"],
+                row["present"],
+                row["absent"],
+                row["total"],
+                round(row["present"] / row["total"] * 100, 2),
+            )
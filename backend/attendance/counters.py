@@ -0,0 +1,125 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Attendance, SubjectAttendanceCounter
+from .utils import status_counts
+from subjects.models import Subject
+from backend.db_routing import use_primary
+
+# maps a status to the counter column it lives in
+COUNTER_FIELDS = {
+    Attendance.Status.PRESENT: "present",
+    Attendance.Status.ABSENT: "absent",
+    Attendance.Status.NO_CLASS: "no_class",
+}
+
+
+def apply_status_changes(changes):
+    """
+    Apply (subject_id, old_status, new_status) transitions to the counters.
+    old_status is None for a new record and new_status is None for a delete.
+    Must be called inside the same transaction as the attendance write.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    for subject_id, old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        if old_status in COUNTER_FIELDS:
+            deltas[subject_id][COUNTER_FIELDS[old_status]] -= 1
+        if new_status in COUNTER_FIELDS:
+            deltas[subject_id][COUNTER_FIELDS[new_status]] += 1
+
+    missing = []
+    for subject_id, fields in deltas.items():
+        fields = {name: delta for name, delta in fields.items() if delta}
+        if not fields:
+            continue
+        # updated_at versions the expanded subject list (see SubjectViewSet.list)
+        updated = SubjectAttendanceCounter.objects.filter(subject_id=subject_id).update(
+            updated_at=timezone.now(),
+            **{name: F(name) + delta for name, delta in fields.items()},
+        )
+        if not updated:
+            missing.append(subject_id)
+
+    # subjects that never had a counter are counted from the raw rows,
+    # which already include the write we are recording
+    if missing:
+        rebuild_counters(missing)
+
+
+def apply_status_change(subject_id, old_status, new_status):
+    apply_status_changes([(subject_id, old_status, new_status)])
+
+
+def count_from_records(subject_ids=None):
+    """
+    Recount the raw Attendance rows. Returns {subject_id: {present, absent, no_class}}
+    for every requested subject (all subjects when subject_ids is None).
+    """
+    subjects = Subject.objects.all()
+    if subject_ids is not None:
+        subjects = subjects.filter(id__in=subject_ids)
+
+    rows = subjects.annotate(**status_counts("attendance_records__")).values(
+        "id", "present", "absent", "no_class"
+    )
+    return {
+        row["id"]: {name: row[name] for name in COUNTER_FIELDS.values()}
+        for row in rows
+    }
+
+
+def rebuild_counters(subject_ids=None):
+    """
+    Overwrite the counters with fresh counts from the raw rows.
+    Returns the number of counters written.
+
+    The existing counters are locked before counting, so a concurrent
+    apply_status_changes waits for the recount to commit and then adds its
+    delta, instead of being overwritten by a count that missed its row.
+    Everything runs on the primary, also when a replica routed read asks
+    for the rebuild.
+    """
+    with use_primary(), transaction.atomic(savepoint=False):
+        counters = SubjectAttendanceCounter.objects.select_for_update()
+        if subject_ids is not None:
+            counters = counters.filter(subject_id__in=subject_ids)
+        list(counters.values_list("pk", flat=True))
+
+        counts = count_from_records(subject_ids)
+        SubjectAttendanceCounter.objects.bulk_create(
+            [
+                SubjectAttendanceCounter(subject_id=subject_id, **values)
+                for subject_id, values in counts.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["subject"],
+            update_fields=[*COUNTER_FIELDS.values(), "updated_at"],
+        )
+    return len(counts)
+
+
+def find_counter_mismatches(subject_ids=None):
+    """
+    Compare stored counters with the raw rows.
+    Returns a list of (subject_id, stored, actual); stored is None when
+    the counter row does not exist.
+    """
+    actual = count_from_records(subject_ids)
+    counters = SubjectAttendanceCounter.objects.all()
+    if subject_ids is not None:
+        counters = counters.filter(subject_id__in=subject_ids)
+
+    stored = {
+        row["subject_id"]: {name: row[name] for name in COUNTER_FIELDS.values()}
+        for row in counters.values("subject_id", *COUNTER_FIELDS.values())
+    }
+    return [
+        (subject_id, stored.get(subject_id), values)
+        for subject_id, values in actual.items()
+        if stored.get(subject_id) != values
+    ]
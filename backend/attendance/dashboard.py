@@ -0,0 +1,96 @@
+from django.db.models import F
+
+from .counters import COUNTER_FIELDS
+from .utils import build_stats, counter_stats, fill_missing_counters
+from subjects.models import Subject
+from subjects.serializers import SubjectSerializer
+from timetable.schedule import WEEK, day_code, next_class_payload, week_from_rows
+
+# bump when the response shape changes; clients check it before reading
+DASHBOARD_VERSION = 1
+
+
+def build_dashboard(user, now):
+    """
+    Everything the home screen shows, from two queries whatever the number
+    of subjects: the subjects with their counters joined in, and their
+    timetables through prefetch_related. now is the user's local time.
+
+    The stats come from SubjectAttendanceCounter rather than a Count over
+    attendance_records: the counter is one row per subject, the aggregate
+    would read every mark of the semester on each load. A subject without
+    a counter row joins as None and is counted once from its records by
+    fill_missing_counters, which stores the counter for next time.
+
+    {
+        "version": 1,
+        "timezone": "Asia/Kolkata",
+        "today": "MON",
+        "overall": {present, absent, no_class, total, percentage},
+        "subjects": [{<subject fields>, "stats": {...}, "timetable": [slot, ...]}, ...],
+        "today_classes": [slot, ...],
+        "next": {<slot>, "date", "starts_at"} | None,
+    }
+    """
+    subjects = list(
+        Subject.objects.filter(owner=user)
+        .annotate(**{
+            field: F(f"attendance_counter__{field}") for field in COUNTER_FIELDS.values()
+        })
+        .prefetch_related("timetable")
+    )
+
+    counters = {
+        row["id"]: row
+        for row in fill_missing_counters([
+            {
+                "id": subject.id,
+                **{
+                    f"attendance_counter__{field}": getattr(subject, field)
+                    for field in COUNTER_FIELDS.values()
+                },
+            }
+            for subject in subjects
+        ])
+    }
+
+    week = week_from_rows(
+        {
+            "id": slot.id,
+            "subject_id": subject.id,
+            "subject__subject_name": subject.subject_name,
+            "day_of_week": slot.day_of_week,
+            "start_time": slot.start_time,
+            "end_time": slot.end_time,
+        }
+        for subject in subjects
+        for slot in subject.timetable.all()
+    )
+    slots_by_subject = {}
+    for day in WEEK:
+        for slot in week["days"][day]:
+            slots_by_subject.setdefault(slot["subject"], []).append(slot)
+
+    present = absent = no_class = 0
+    items = []
+    for subject, data in zip(subjects, SubjectSerializer(subjects, many=True).data):
+        stats = counter_stats(counters[subject.id])
+        present += stats["present"]
+        absent += stats["absent"]
+        no_class += stats["no_class"]
+        items.append({
+            **data,
+            "stats": stats,
+            "timetable": slots_by_subject.get(subject.id, []),
+        })
+
+    today = day_code(now)
+    return {
+        "version": DASHBOARD_VERSION,
+        "timezone": str(now.tzinfo),
+        "today": today,
+        "overall": build_stats(present, absent, no_class),
+        "subjects": items,
+        "today_classes": week["days"][today],
+        "next": next_class_payload(week, now),
+    }
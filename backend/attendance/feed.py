@@ -0,0 +1,73 @@
+from django.db.models import Exists, OuterRef
+
+from .sync import changes_since
+from subjects.models import Subject, SubjectTombstone
+from subjects.serializers import SubjectSerializer
+from timetable.models import Timetable, TimetableTombstone
+
+
+def _timetable_since(user, since):
+    slots = Timetable.objects.filter(subject__owner=user)
+    if since is not None:
+        slots = slots.filter(updated_at__gt=since)
+    upserted = [
+        {
+            "id": slot_id,
+            "subject": subject_id,
+            "day_of_week": day,
+            "start_time": start.isoformat() if start else None,
+            "end_time": end.isoformat() if end else None,
+            "updated_at": updated_at.isoformat(),
+        }
+        for slot_id, subject_id, day, start, end, updated_at in slots.order_by("updated_at", "id")
+        .values_list("id", "subject_id", "day_of_week", "start_time", "end_time", "updated_at")
+    ]
+
+    deleted = []
+    if since is not None:
+        # a day that was removed and added again is only reported as written
+        restored = Timetable.objects.filter(subject_id=OuterRef("subject_id"), day_of_week=OuterRef("day_of_week"))
+        deleted = [
+            {"subject": subject_id, "day_of_week": day, "deleted_at": deleted_at.isoformat()}
+            for subject_id, day, deleted_at in TimetableTombstone.objects.filter(
+                subject__owner=user, deleted_at__gt=since
+            )
+            .exclude(Exists(restored))
+            .order_by("deleted_at", "id")
+            .values_list("subject_id", "day_of_week", "deleted_at")
+        ]
+    return {"upserted": upserted, "deleted": deleted}
+
+
+def _subjects_since(user, since):
+    subjects = Subject.objects.filter(owner=user)
+    if since is not None:
+        subjects = subjects.filter(updated_at__gt=since)
+
+    deleted = []
+    if since is not None:
+        deleted = [
+            {"id": subject_id, "deleted_at": deleted_at.isoformat()}
+            for subject_id, deleted_at in SubjectTombstone.objects.filter(owner=user, deleted_at__gt=since)
+            .order_by("deleted_at", "id")
+            .values_list("subject_id", "deleted_at")
+        ]
+    return {
+        "upserted": SubjectSerializer(subjects.order_by("updated_at", "id"), many=True).data,
+        "deleted": deleted,
+    }
+
+
+def build_feed(user, since):
+    """
+    Subjects, timetable days and attendance marks of the user created,
+    updated or deleted after since (a decoded cursor), six indexed queries.
+    Without a cursor every live row is returned and nothing as deleted.
+    A deleted subject takes its timetable and marks with it; those are not
+    listed separately.
+    """
+    return {
+        "subjects": _subjects_since(user, since),
+        "timetable": _timetable_since(user, since),
+        "attendance": changes_since(user, since),
+    }
@@ -0,0 +1,200 @@
+import csv
+
+from django.db import transaction
+from django.utils.dateparse import parse_date, parse_time
+
+from .bulk import upsert_attendance
+from .cache import invalidate_stats
+from .models import Attendance, SubjectAttendanceCounter
+from subjects.models import Subject
+from subjects.ownership import invalidate_owned_subjects
+from timetable.models import Timetable
+from timetable.schedule import invalidate_week
+
+ATTENDANCE = "attendance"
+TIMETABLE = "timetable"
+
+# header columns each kind of file needs; extra columns are ignored, so a
+# file from the export endpoint can be imported back as is
+REQUIRED_COLUMNS = {
+    ATTENDANCE: {"subject_name", "date", "status"},
+    TIMETABLE: {"subject_name", "day_of_week"},
+}
+
+MAX_REPORTED_ERRORS = 1000
+
+# looked up once per row; the enum properties rebuild their lists on every access
+STATUSES = frozenset(Attendance.Status.values)
+DAYS = frozenset(Timetable.DayOfWeek.values)
+
+
+class CsvImporter:
+    """
+    Stream a CSV of attendance or timetable rows into the user's data.
+
+    Rows are read lazily and written in chunks: subject names are resolved
+    against (subject_name, owner) with one query per chunk, missing subjects
+    are created with one bulk_create, and the rows are upserted with one
+    bulk statement, each chunk in its own transaction. Bad rows are skipped
+    and reported with their line number.
+    """
+
+    def __init__(self, user, kind, chunk_size=5000):
+        if kind not in REQUIRED_COLUMNS:
+            raise ValueError(f"kind must be {ATTENDANCE} or {TIMETABLE}")
+        self.user = user
+        self.kind = kind
+        self.chunk_size = chunk_size
+        self.subject_ids = {}
+        self.report = {
+            "rows": 0,
+            "imported": 0,
+            "created_subjects": [],
+            "error_count": 0,
+            "errors": [],
+        }
+
+    def run(self, lines):
+        reader = csv.DictReader(lines)
+        missing = REQUIRED_COLUMNS[self.kind] - set(reader.fieldnames or [])
+        if missing:
+            self.error(1, {"header": [f"Missing column(s): {', '.join(sorted(missing))}"]})
+            return self.report
+
+        chunk = []
+        for row in reader:
+            self.report["rows"] += 1
+            parsed = self.parse(reader.line_num, row)
+            if parsed is not None:
+                chunk.append(parsed)
+            if len(chunk) >= self.chunk_size:
+                self.write(chunk)
+                chunk = []
+        if chunk:
+            self.write(chunk)
+        return self.report
+
+    def error(self, line, errors):
+        self.report["error_count"] += 1
+        if len(self.report["errors"]) < MAX_REPORTED_ERRORS:
+            self.report["errors"].append({"line": line, "errors": errors})
+
+    # --- parsing -------------------------------------------------------------
+
+    def parse(self, line, row):
+        name = (row.get("subject_name") or "").strip()
+        errors = {}
+        if not name:
+            errors["subject_name"] = ["Required."]
+        elif len(name) > Subject._meta.get_field("subject_name").max_length:
+            errors["subject_name"] = ["Too long."]
+
+        if self.kind == ATTENDANCE:
+            value = self.parse_attendance(row, errors)
+        else:
+            value = self.parse_timetable(row, errors)
+
+        if errors:
+            self.error(line, errors)
+            return None
+        return (name, *value)
+
+    def parse_attendance(self, row, errors):
+        day = None
+        try:
+            day = parse_date((row.get("date") or "").strip())
+        except ValueError:
+            pass
+        if day is None:
+            errors["date"] = ["Use the YYYY-MM-DD format."]
+
+        status_value = (row.get("status") or "").strip().upper()
+        if status_value not in STATUSES:
+            errors["status"] = [f"Use one of {', '.join(Attendance.Status.values)}."]
+        return day, status_value
+
+    def parse_timetable(self, row, errors):
+        day = (row.get("day_of_week") or "").strip().upper()[:3]
+        if day not in DAYS:
+            errors["day_of_week"] = [f"Use one of {', '.join(Timetable.DayOfWeek.values)}."]
+
+        times = []
+        for column in ("start_time", "end_time"):
+            raw = (row.get(column) or "").strip()
+            value = None
+            if raw:
+                try:
+                    value = parse_time(raw)
+                except ValueError:
+                    pass
+                if value is None:
+                    errors[column] = ["Use the HH:MM format."]
+            times.append(value)
+        if times[0] and times[1] and times[1] <= times[0]:
+            errors["end_time"] = ["end_time must be after start_time"]
+        return day, times[0], times[1]
+
+    # --- writing -------------------------------------------------------------
+
+    def resolve_subjects(self, names):
+        unknown = set(names) - self.subject_ids.keys()
+        if not unknown:
+            return
+
+        found = dict(
+            Subject.objects.filter(owner=self.user, subject_name__in=unknown)
+            .values_list("subject_name", "id")
+        )
+        to_create = unknown - found.keys()
+        if to_create:
+            # bulk_create skips post_save: counters are created below and the
+            # caches are invalidated once per chunk in write()
+            Subject.objects.bulk_create(
+                [Subject(subject_name=name, owner=self.user) for name in sorted(to_create)],
+                ignore_conflicts=True,
+            )
+            found.update(
+                Subject.objects.filter(owner=self.user, subject_name__in=to_create)
+                .values_list("subject_name", "id")
+            )
+            SubjectAttendanceCounter.objects.bulk_create(
+                [SubjectAttendanceCounter(subject_id=found[name]) for name in to_create],
+                ignore_conflicts=True,
+            )
+            invalidate_owned_subjects(self.user.id)
+            self.report["created_subjects"].extend(sorted(to_create))
+        self.subject_ids.update(found)
+
+    def write(self, chunk):
+        with transaction.atomic():
+            self.resolve_subjects({row[0] for row in chunk})
+
+            # the last row for the same key wins, like marking in file order
+            latest = {}
+            for name, key, *values in chunk:
+                latest[(self.subject_ids[name], key)] = values
+
+            if self.kind == ATTENDANCE:
+                upsert_attendance([
+                    (subject_id, day, status_value)
+                    for (subject_id, day), (status_value,) in latest.items()
+                ])
+            else:
+                Timetable.objects.bulk_create(
+                    [
+                        Timetable(subject_id=subject_id, day_of_week=day, start_time=start, end_time=end)
+                        for (subject_id, day), (start, end) in latest.items()
+                    ],
+                    update_conflicts=True,
+                    unique_fields=["subject", "day_of_week"],
+                    update_fields=["start_time", "end_time", "updated_at"],
+                )
+                invalidate_week(self.user.id)
+
+            # timetable rows never touch the attendance history
+            invalidate_stats(
+                self.user.id,
+                {subject_id for subject_id, _ in latest},
+                dates={day for _, day in latest} if self.kind == ATTENDANCE else (),
+            )
+        self.report["imported"] += len(chunk)
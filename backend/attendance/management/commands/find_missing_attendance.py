@@ -0,0 +1,176 @@
+import csv
+import heapq
+import json
+import time
+from collections import defaultdict
+from datetime import timedelta
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from attendance.cache import invalidate_stats
+from attendance.counters import rebuild_counters
+from attendance.models import Attendance
+from timetable.models import Timetable
+from timetable.schedule import WEEK
+
+User = get_user_model()
+
+
+def weekday_dates(start, end, weekday):
+    day = start + timedelta(days=(weekday - start.weekday()) % 7)
+    while day <= end:
+        yield day
+        day += timedelta(days=7)
+
+
+def scheduled_dates(start, end, weekdays):
+    """
+    Dates in [start, end] that fall on one of weekdays (0 = Monday), in
+    date order, generated week by week without materialising the whole range.
+    """
+    return heapq.merge(*(weekday_dates(start, end, weekday) for weekday in weekdays))
+
+
+class Command(BaseCommand):
+    help = (
+        "List scheduled days that were never marked (from the timetable) for every user, "
+        "optionally filling them with NO_CLASS placeholders. Users are processed in "
+        "id-ordered chunks so memory stays bounded and a run can be resumed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start", required=True, help="YYYY-MM-DD, inclusive")
+        parser.add_argument("--to", dest="end", help="YYYY-MM-DD, inclusive (default: today)")
+        parser.add_argument("--fill", action="store_true", help="Insert NO_CLASS rows for the missing days.")
+        parser.add_argument("--chunk-size", type=int, default=200, help="Users per chunk (default 200).")
+        parser.add_argument("--output", help="Write missing marks as CSV here (default: stdout).")
+        parser.add_argument(
+            "--state",
+            help="Checkpoint file; the last finished user id is saved after every chunk "
+                 "and a run with the same file continues from there.",
+        )
+
+    def handle(self, *args, **options):
+        start = parse_date(options["start"] or "")
+        end = parse_date(options["end"]) if options["end"] else timezone.localdate()
+        if start is None or end is None:
+            raise CommandError("--from/--to must be YYYY-MM-DD")
+        if end < start:
+            raise CommandError("--to is before --from")
+        chunk_size = options["chunk_size"]
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        state_path = Path(options["state"]) if options["state"] else None
+        last_user_id = 0
+        if state_path and state_path.exists():
+            last_user_id = json.loads(state_path.read_text())["last_user_id"]
+            self.stderr.write(f"Resuming after user {last_user_id}")
+
+        # a resumed run appends to the same file, which already has the header;
+        # a fresh one starts the report over
+        resuming = bool(last_user_id)
+        output = (
+            open(options["output"], "a" if resuming else "w", newline="")
+            if options["output"]
+            else self.stdout
+        )
+        writer = csv.writer(output)
+        if not (resuming and options["output"]):
+            writer.writerow(["user_id", "subject_id", "date"])
+
+        totals = {"users": 0, "missing": 0, "filled": 0}
+        started = time.monotonic()
+        try:
+            while True:
+                user_ids = list(
+                    User.objects.filter(id__gt=last_user_id)
+                    .order_by("id")
+                    .values_list("id", flat=True)[:chunk_size]
+                )
+                if not user_ids:
+                    break
+
+                missing, filled = self.process_chunk(user_ids, start, end, writer, options["fill"])
+                output.flush()
+
+                last_user_id = user_ids[-1]
+                totals["users"] += len(user_ids)
+                totals["missing"] += missing
+                totals["filled"] += filled
+                if state_path:
+                    state_path.write_text(json.dumps({"last_user_id": last_user_id}))
+
+                self.stderr.write(
+                    f"users {user_ids[0]}-{last_user_id}: {missing} missing, {filled} filled "
+                    f"({totals['users']} users, {time.monotonic() - started:.1f}s)"
+                )
+        finally:
+            if output is not self.stdout:
+                output.close()
+
+        if state_path and state_path.exists():
+            state_path.unlink()
+        self.stderr.write(self.style.SUCCESS(
+            f"Done: {totals['users']} users, {totals['missing']} missing marks, "
+            f"{totals['filled']} placeholders inserted"
+        ))
+
+    def process_chunk(self, user_ids, start, end, writer, fill):
+        # subject -> (owner, first day, weekdays) for every timetabled subject of
+        # the chunk; days before the subject was created cannot be missing
+        schedule = {}
+        for subject_id, owner_id, created_at, day in (
+            Timetable.objects.filter(subject__owner_id__in=user_ids)
+            .order_by()
+            .values_list("subject_id", "subject__owner_id", "subject__created_at", "day_of_week")
+            .iterator(chunk_size=2000)
+        ):
+            first_day = max(start, timezone.localdate(created_at))
+            schedule.setdefault(subject_id, (owner_id, first_day, set()))[2].add(WEEK.index(day))
+        if not schedule:
+            return 0, 0
+
+        marked = defaultdict(set)
+        for subject_id, day in (
+            Attendance.objects.filter(subject_id__in=schedule.keys(), date__range=(start, end))
+            .order_by()
+            .values_list("subject_id", "date")
+            .iterator(chunk_size=2000)
+        ):
+            marked[subject_id].add(day)
+
+        placeholders = []
+        missing = 0
+        for subject_id, (owner_id, first_day, weekdays) in schedule.items():
+            for day in scheduled_dates(first_day, end, weekdays):
+                if day in marked[subject_id]:
+                    continue
+                missing += 1
+                writer.writerow([owner_id, subject_id, day.isoformat()])
+                if fill:
+                    placeholders.append(
+                        Attendance(subject_id=subject_id, date=day, status=Attendance.Status.NO_CLASS)
+                    )
+
+        if not placeholders:
+            return missing, 0
+
+        with transaction.atomic():
+            # a mark made since the read above wins over the placeholder
+            Attendance.objects.bulk_create(placeholders, ignore_conflicts=True, batch_size=1000)
+            touched = {row.subject_id for row in placeholders}
+            # locks the counters before recounting, so a mark made meanwhile
+            # adds its delta after this commits instead of being lost
+            rebuild_counters(touched)
+            dates = {row.date for row in placeholders}
+            for owner_id in {schedule[subject_id][0] for subject_id in touched}:
+                invalidate_stats(
+                    owner_id, [s for s in touched if schedule[s][0] == owner_id], dates=dates
+                )
+        return missing, len(placeholders)
@@ -0,0 +1,52 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.importer import ATTENDANCE, REQUIRED_COLUMNS, CsvImporter
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Import attendance (subject_name,date,status) or timetable "
+        "(subject_name,day_of_week,start_time,end_time) rows from a CSV file for one user. "
+        "Unknown subjects are created, rows are upserted in chunks and bad rows are reported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file with a header row.")
+        parser.add_argument("--user", required=True, help="Username that owns the data.")
+        parser.add_argument("--kind", choices=sorted(REQUIRED_COLUMNS), default=ATTENDANCE)
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per transaction (default 5000).")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user '{options['user']}'")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        started = time.monotonic()
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as fh:
+                report = CsvImporter(user, options["kind"], options["chunk_size"]).run(fh)
+        except (OSError, UnicodeDecodeError) as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}")
+
+        for error in report["errors"]:
+            details = "; ".join(
+                f"{column}: {' '.join(messages)}" for column, messages in error["errors"].items()
+            )
+            self.stderr.write(f"line {error['line']}: {details}")
+        if report["error_count"] > len(report["errors"]):
+            self.stderr.write(f"... {report['error_count'] - len(report['errors'])} more errors")
+
+        if report["created_subjects"]:
+            self.stdout.write(f"Created subjects: {', '.join(report['created_subjects'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['imported']} of {report['rows']} rows "
+            f"({report['error_count']} errors) in {time.monotonic() - started:.1f}s"
+        ))
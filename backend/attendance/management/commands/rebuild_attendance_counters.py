@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from attendance.counters import find_counter_mismatches, rebuild_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the per subject attendance counters from the raw Attendance rows, "
+        "or with --check only report counters that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only compare counters with the raw rows; exit with an error on mismatch.",
+        )
+        parser.add_argument(
+            "--subject",
+            type=int,
+            action="append",
+            dest="subjects",
+            help="Limit to a subject id (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        subject_ids = options["subjects"]
+
+        if options["check"]:
+            mismatches = find_counter_mismatches(subject_ids)
+            for subject_id, stored, actual in mismatches:
+                self.stdout.write(f"subject {subject_id}: stored={stored} actual={actual}")
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} counter(s) out of sync")
+            self.stdout.write(self.style.SUCCESS("All attendance counters match"))
+            return
+
+        with transaction.atomic():
+            written = rebuild_counters(subject_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} attendance counter(s)"))
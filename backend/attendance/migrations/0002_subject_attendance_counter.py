@@ -0,0 +1,49 @@
+# Generated by Django 5.2.10 on 2026-10-18 18:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def build_counters(apps, schema_editor):
+    Subject = apps.get_model('subjects', 'Subject')
+    SubjectAttendanceCounter = apps.get_model('attendance', 'SubjectAttendanceCounter')
+
+    def count(status):
+        return Count('attendance_records', filter=Q(attendance_records__status=status))
+
+    rows = Subject.objects.annotate(
+        present=count('PRESENT'),
+        absent=count('ABSENT'),
+        no_class=count('NO_CLASS'),
+    ).values_list('id', 'present', 'absent', 'no_class')
+
+    SubjectAttendanceCounter.objects.bulk_create(
+        [
+            SubjectAttendanceCounter(subject_id=subject_id, present=present, absent=absent, no_class=no_class)
+            for subject_id, present, absent, no_class in rows.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0001_initial'),
+        ('subjects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubjectAttendanceCounter',
+            fields=[
+                ('subject', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='attendance_counter', serialize=False, to='subjects.subject')),
+                ('present', models.IntegerField(default=0)),
+                ('absent', models.IntegerField(default=0)),
+                ('no_class', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(build_counters, migrations.RunPython.noop),
+    ]
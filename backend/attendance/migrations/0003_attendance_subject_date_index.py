@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_subject_attendance_counter'),
+        ('subjects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['subject', '-date'], include=('status',), name='attendance_subject_date_desc'),
+        ),
+    ]
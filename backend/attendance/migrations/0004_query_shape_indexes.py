@@ -0,0 +1,22 @@
+# Generated by Django 5.2.10 on 2026-10-18 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_attendance_subject_date_index'),
+        ('subjects', '0002_query_shape_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['subject', 'status'], name='attendance_subject_status'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(condition=models.Q(('status__in', ['PRESENT', 'ABSENT'])), fields=['subject', 'date'], name='attendance_counted_days'),
+        ),
+    ]
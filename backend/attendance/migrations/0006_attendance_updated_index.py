@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 19:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0005_sync_tombstones_receipts'),
+        ('subjects', '0003_subject_tombstone'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['subject', 'updated_at'], name='attendance_subject_updated'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.10 on 2026-10-18 20:43
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_write_times(apps, schema_editor):
+    # existing rows were all written online: the edit happened when it arrived
+    apps.get_model("attendance", "Attendance").objects.update(changed_at=F("updated_at"))
+    apps.get_model("attendance", "AttendanceTombstone").objects.update(changed_at=F("deleted_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0006_attendance_updated_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='attendancetombstone',
+            name='changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(copy_write_times, migrations.RunPython.noop),
+    ]
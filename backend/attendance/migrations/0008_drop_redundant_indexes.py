@@ -0,0 +1,17 @@
+# Generated by Django 5.2.10 on 2026-10-18 20:57
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0007_attendance_changed_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='attendance',
+            name='attendance_subject_date_desc',
+        ),
+    ]
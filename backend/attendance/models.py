@@ -1,4 +1,6 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from subjects.models import Subject
 
 
@@ -28,12 +30,100 @@ class Attendance(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # when the user made the change: the device's time for offline sync,
+    # otherwise when the server got it. Sync conflicts compare this, not
+    # updated_at, which is when the write reached the server
+    changed_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
+        # its index also serves the calendar and export reads (one subject,
+        # a date window, scanned in either direction)
         unique_together = ("subject", "date")
         ordering = ["-date"]
+        indexes = [
+            # per status counts of one subject (counter rebuilds)
+            models.Index(fields=["subject", "status"], name="attendance_subject_status"),
+            # only PRESENT/ABSENT days count towards the percentage; the
+            # partial index skips NO_CLASS rows entirely
+            models.Index(
+                fields=["subject", "date"],
+                condition=models.Q(status__in=["PRESENT", "ABSENT"]),
+                name="attendance_counted_days",
+            ),
+            # change feed / sync deltas: one subject's rows written after a cursor
+            models.Index(fields=["subject", "updated_at"], name="attendance_subject_updated"),
+        ]
 
     def __str__(self):
         return f"{self.subject} | {self.date} | {self.status}"
 
 
+class SubjectAttendanceCounter(models.Model):
+    """
+    Denormalized present/absent/no class totals for a subject.
+    Kept in sync by the attendance write paths so the stats endpoints
+    read one row instead of recounting every Attendance record.
+    Rebuild or check with: python manage.py rebuild_attendance_counters
+    """
+
+    subject = models.OneToOneField(
+        Subject,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="attendance_counter"
+    )
+
+    present = models.IntegerField(default=0)
+    absent = models.IntegerField(default=0)
+    no_class = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.subject} | P:{self.present} A:{self.absent} N:{self.no_class}"
+
+
+class AttendanceTombstone(models.Model):
+    """
+    Marks that were removed (unmarked), one row per subject and date with
+    the time of the last removal. Lets offline sync tell a deleted mark from
+    one that never existed and hand deletions to other devices.
+    """
+
+    subject = models.ForeignKey(
+        Subject,
+        on_delete=models.CASCADE,
+        related_name="attendance_tombstones"
+    )
+    date = models.DateField()
+    deleted_at = models.DateTimeField(db_index=True)
+    # when the user removed the mark, see Attendance.changed_at
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ("subject", "date")
+
+    def __str__(self):
+        return f"{self.subject} | {self.date} | deleted {self.deleted_at}"
+
+
+class SyncReceipt(models.Model):
+    """
+    Result of one offline change, stored under the client's idempotency key
+    so a replayed batch gets the same answer instead of writing twice.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="sync_receipts"
+    )
+    key = models.CharField(max_length=64)
+    result = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ("user", "key")
+
+    def __str__(self):
+        return f"{self.user_id} | {self.key}"
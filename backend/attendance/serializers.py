@@ -13,4 +13,25 @@ class AttendanceSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+class AttendanceMarkSerializer(serializers.Serializer):
+    """
+    One (subject, date, status) entry of a batch mark request.
+    Ownership of the subject is checked by the view for the whole batch.
+    """
+    subject = serializers.IntegerField()
+    date = serializers.DateField()
+    status = serializers.ChoiceField(choices=Attendance.Status.choices)
+
+
+class SyncChangeSerializer(serializers.Serializer):
+    """
+    One queued offline change. status null removes the mark; client_time is
+    when the user made the change and decides conflicts with the server.
+    """
+    key = serializers.CharField(max_length=64)
+    subject = serializers.IntegerField()
+    date = serializers.DateField()
+    status = serializers.ChoiceField(choices=Attendance.Status.choices, allow_null=True)
+    client_time = serializers.DateTimeField()
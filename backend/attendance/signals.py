@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_stats
+from .models import SubjectAttendanceCounter
+from subjects.models import Subject
+
+
+@receiver(post_save, sender=Subject)
+def create_attendance_counter(sender, instance, created, **kwargs):
+    # a new subject starts with an empty counter so stats never have to rebuild it
+    if created:
+        SubjectAttendanceCounter.objects.get_or_create(subject=instance)
+    # the overall breakdown lists every subject by name; analytics read the
+    # names live, so their closed periods stay valid
+    invalidate_stats(instance.owner_id, [instance.id], dates=())
+
+
+@receiver(post_delete, sender=Subject)
+def drop_subject_stats(sender, instance, **kwargs):
+    # covers SubjectViewSet deletes and cascades from a deleted user
+    invalidate_stats(instance.owner_id, [instance.id])
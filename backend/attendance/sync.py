@@ -0,0 +1,201 @@
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .bulk import lock_marks, pairs_filter, raced_subjects
+from .cache import invalidate_stats
+from .counters import apply_status_changes, rebuild_counters
+from .models import Attendance, AttendanceTombstone, SyncReceipt
+
+APPLIED = "applied"
+UNCHANGED = "unchanged"
+CONFLICT = "conflict"
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def encode_token(moment):
+    return str((moment - EPOCH) // datetime.timedelta(microseconds=1))
+
+
+def decode_token(token):
+    """
+    Sync token -> aware datetime. None for a missing token, ValueError for
+    a malformed one.
+    """
+    if token in (None, ""):
+        return None
+    return EPOCH + datetime.timedelta(microseconds=int(token))
+
+
+def record_deletions(pairs, now=None, changed_at=None):
+    """
+    One tombstone per (subject_id, date), moved forward on every removal.
+    changed_at maps a pair to when the user removed it (offline sync);
+    other pairs were removed now.
+    """
+    now = now or timezone.now()
+    changed_at = changed_at or {}
+    AttendanceTombstone.objects.bulk_create(
+        [
+            AttendanceTombstone(
+                subject_id=subject_id,
+                date=day,
+                deleted_at=now,
+                changed_at=changed_at.get((subject_id, day), now),
+            )
+            for subject_id, day in pairs
+        ],
+        update_conflicts=True,
+        unique_fields=["subject", "date"],
+        update_fields=["deleted_at", "changed_at"],
+    )
+
+
+def _current_state(pairs):
+    """
+    (status, changed_at) of every pair that has a mark or a tombstone; the
+    marks are locked so the counters see the real old status.
+    """
+    state = lock_marks(pairs, "changed_at")
+    subject_ids = {subject_id for subject_id, _ in pairs}
+    dates = {day for _, day in pairs}
+    for subject_id, day, changed_at in (
+        AttendanceTombstone.objects.filter(subject_id__in=subject_ids, date__in=dates)
+        .values_list("subject_id", "date", "changed_at")
+    ):
+        state.setdefault((subject_id, day), (None, changed_at))
+    return state
+
+
+def apply_changes(user, changes):
+    """
+    Apply validated offline changes of subjects the user owns, in order.
+    Each change is {key, subject, date, status (None = unmark), client_time}.
+
+    A change loses when the server state of its (subject, date) was changed
+    by the user after client_time (changed_at, the time of the edit, not of
+    its sync), so the latest edit wins whichever device syncs first. Results are stored under the idempotency key, so a
+    key seen before returns its first result and writes nothing.
+    Returns {key: result}.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        replayed = dict(
+            SyncReceipt.objects.filter(user=user, key__in=[change["key"] for change in changes])
+            .values_list("key", "result")
+        )
+        pending = [change for change in changes if change["key"] not in replayed]
+        pairs = {(change["subject"], change["date"]) for change in pending}
+        state = _current_state(pairs) if pairs else {}
+        original = {pair: state.get(pair, (None, None))[0] for pair in pairs}
+
+        results = {}
+        for change in pending:
+            if change["key"] in results:
+                continue
+            pair = (change["subject"], change["date"])
+            current, changed_at = state.get(pair, (None, None))
+            if changed_at is not None and changed_at > change["client_time"]:
+                outcome = {
+                    "result": CONFLICT,
+                    "server": {"status": current, "changed_at": changed_at.isoformat()},
+                }
+            elif current == change["status"]:
+                outcome = {"result": UNCHANGED}
+            else:
+                # later changes of the same batch are judged against this one
+                state[pair] = (change["status"], change["client_time"])
+                outcome = {"result": APPLIED}
+            results[change["key"]] = {
+                "key": change["key"],
+                "subject": change["subject"],
+                "date": change["date"].isoformat(),
+                "status": change["status"],
+                **outcome,
+            }
+
+        final = {
+            pair: state[pair][0]
+            for pair in pairs
+            if pair in state and state[pair][0] != original[pair]
+        }
+        marks = [
+            Attendance(subject_id=subject_id, date=day, status=status_value, changed_at=state[(subject_id, day)][1])
+            for (subject_id, day), status_value in final.items()
+            if status_value is not None
+        ]
+        if marks:
+            Attendance.objects.bulk_create(
+                marks,
+                update_conflicts=True,
+                unique_fields=["subject", "date"],
+                update_fields=["status", "changed_at", "updated_at"],
+            )
+        removed = [pair for pair, status_value in final.items() if status_value is None]
+        if removed:
+            Attendance.objects.filter(pairs_filter(removed)).delete()
+            record_deletions(removed, now, changed_at={pair: state[pair][1] for pair in removed})
+        apply_status_changes(
+            (subject_id, original[(subject_id, day)], status_value)
+            for (subject_id, day), status_value in final.items()
+        )
+        raced = raced_subjects([mark for mark in marks if original[(mark.subject_id, mark.date)] is None])
+        if raced:
+            rebuild_counters(raced)
+
+        SyncReceipt.objects.bulk_create(
+            [SyncReceipt(user=user, key=key, result=result) for key, result in results.items()],
+            ignore_conflicts=True,
+        )
+        SyncReceipt.objects.filter(
+            user=user,
+            created_at__lt=now - datetime.timedelta(days=settings.SYNC_RECEIPT_DAYS),
+        ).delete()
+        if final:
+            invalidate_stats(
+                user.id,
+                {subject_id for subject_id, _ in final},
+                dates={day for _, day in final},
+            )
+
+    return {**{key: {**result, "replayed": True} for key, result in replayed.items()}, **results}
+
+
+def changes_since(user, since):
+    """
+    Marks written and removed after since (every mark when since is None,
+    with nothing to delete), oldest first.
+    """
+    records = Attendance.objects.filter(subject__owner=user)
+    if since is not None:
+        records = records.filter(updated_at__gt=since)
+    upserted = [
+        {"subject": subject_id, "date": day.isoformat(), "status": status_value, "updated_at": updated_at.isoformat()}
+        for subject_id, day, status_value, updated_at in records.order_by("updated_at", "id")
+        .values_list("subject_id", "date", "status", "updated_at")
+    ]
+
+    deleted = []
+    if since is not None:
+        # a mark that was removed and written again is only reported as written
+        restored = Attendance.objects.filter(subject_id=OuterRef("subject_id"), date=OuterRef("date"))
+        deleted = [
+            {"subject": subject_id, "date": day.isoformat(), "deleted_at": deleted_at.isoformat()}
+            for subject_id, day, deleted_at in AttendanceTombstone.objects.filter(
+                subject__owner=user, deleted_at__gt=since
+            )
+            .exclude(Exists(restored))
+            .order_by("deleted_at", "id")
+            .values_list("subject_id", "date", "deleted_at")
+        ]
+    return {"upserted": upserted, "deleted": deleted}
+
+
+def next_token(started):
+    # rewound by SYNC_TOKEN_OVERLAP so rows committed late by concurrent
+    # requests with an earlier updated_at are sent again instead of missed
+    return encode_token(started - datetime.timedelta(seconds=settings.SYNC_TOKEN_OVERLAP))
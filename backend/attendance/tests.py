@@ -1,3 +1,1188 @@
-from django.test import TestCase
+import time
+from datetime import date, datetime, timezone as dt_timezone
+from io import StringIO
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework.test import APITestCase
+
+from .admin import AttendanceAdmin
+from .counters import find_counter_mismatches, rebuild_counters
+from .models import Attendance, SubjectAttendanceCounter
+from subjects.models import Subject
+
+User = get_user_model()
+
+
+class AttendanceTestMixin:
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="student", password="pass12345", id_card_number="ID001"
+        )
+        self.client.force_authenticate(self.user)
+        self.dbms = Subject.objects.create(subject_name="DBMS", owner=self.user)
+        self.os = Subject.objects.create(subject_name="OS", owner=self.user)
+
+    def mark(self, subject, day, status):
+        return Attendance.objects.create(
+            subject=subject, date=date(2026, 1, day), status=status
+        )
+
+
+class AttendanceStatsTests(AttendanceTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.mark(self.dbms, 1, Attendance.Status.PRESENT)
+        self.mark(self.dbms, 2, Attendance.Status.PRESENT)
+        self.mark(self.dbms, 3, Attendance.Status.ABSENT)
+        self.mark(self.dbms, 4, Attendance.Status.NO_CLASS)
+        self.mark(self.os, 1, Attendance.Status.ABSENT)
+        rebuild_counters()
+
+    def test_subject_stats_single_query(self):
+        url = reverse("subject-attendance-stats", args=[self.dbms.id])
+        with self.assertNumQueries(1):
+            stats = self.client.get(url).json()
+
+        self.assertEqual(stats, {
+            "present": 2,
+            "absent": 1,
+            "no_class": 1,
+            "total": 3,
+            "percentage": 66.67,
+        })
+
+    def test_subject_stats_other_owner_is_404(self):
+        other = User.objects.create_user(
+            username="other", password="pass12345", id_card_number="ID002"
+        )
+        subject = Subject.objects.create(subject_name="DBMS", owner=other)
+
+        url = reverse("subject-attendance-stats", args=[subject.id])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_overall_stats_with_breakdown_single_query(self):
+        Subject.objects.create(subject_name="Maths", owner=self.user)
+
+        with self.assertNumQueries(1):
+            stats = self.client.get(reverse("overall-attendance-stats")).json()
+
+        self.assertEqual(stats["present"], 2)
+        self.assertEqual(stats["absent"], 2)
+        self.assertEqual(stats["no_class"], 1)
+        self.assertEqual(stats["total"], 4)
+        self.assertEqual(stats["percentage"], 50.0)
+
+        by_name = {row["subject_name"]: row for row in stats["subjects"]}
+        self.assertEqual(by_name["DBMS"]["percentage"], 66.67)
+        self.assertEqual(by_name["OS"]["absent"], 1)
+        self.assertEqual(by_name["Maths"]["total"], 0)
+        self.assertEqual(by_name["Maths"]["percentage"], 0)
+
+    def test_missing_counter_is_built_on_read(self):
+        SubjectAttendanceCounter.objects.filter(subject=self.dbms).delete()
+
+        url = reverse("subject-attendance-stats", args=[self.dbms.id])
+        self.assertEqual(self.client.get(url).json()["present"], 2)
+        self.assertTrue(SubjectAttendanceCounter.objects.filter(subject=self.dbms).exists())
+
+
+class AttendanceCounterTests(AttendanceTestMixin, APITestCase):
+    def post_mark(self, day, status):
+        return self.client.post(
+            reverse("mark-attendance"),
+            {"subject": self.dbms.id, "date": f"2026-01-{day:02d}", "status": status},
+            format="json",
+        )
+
+    def counter(self):
+        counter = SubjectAttendanceCounter.objects.get(subject=self.dbms)
+        return counter.present, counter.absent, counter.no_class
+
+    def test_mark_updates_counters(self):
+        self.post_mark(1, "PRESENT")
+        self.post_mark(2, "ABSENT")
+        self.post_mark(3, "NO_CLASS")
+        self.assertEqual(self.counter(), (1, 1, 1))
+
+    def test_status_transition_moves_count(self):
+        self.post_mark(1, "PRESENT")
+        self.post_mark(1, "ABSENT")
+        self.assertEqual(self.counter(), (0, 1, 0))
+
+        # re-marking the same status is not counted twice
+        self.post_mark(1, "ABSENT")
+        self.assertEqual(self.counter(), (0, 1, 0))
+
+    def test_delete_decrements_counter(self):
+        self.post_mark(1, "PRESENT")
+        self.post_mark(2, "PRESENT")
+        self.client.delete(
+            reverse("mark-attendance"),
+            {"subject": self.dbms.id, "date": "2026-01-01"},
+            format="json",
+        )
+        self.assertEqual(self.counter(), (1, 0, 0))
+        self.assertEqual(find_counter_mismatches(), [])
+
+    def test_unpadded_and_malformed_dates(self):
+        url = reverse("mark-attendance")
+        body = {"subject": self.dbms.id, "date": "2026-1-5", "status": "PRESENT"}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post(url, body, format="json").status_code, 200)
+            self.assertEqual(self.client.delete(url, body, format="json").status_code, 204)
+        self.assertEqual(self.counter(), (0, 0, 0))
+
+        body["date"] = "yesterday"
+        self.assertEqual(self.client.post(url, body, format="json").status_code, 400)
+        self.assertEqual(self.client.delete(url, body, format="json").status_code, 400)
+
+    def test_unknown_status_is_rejected(self):
+        self.assertEqual(self.post_mark(1, "LATE").status_code, 400)
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_admin_edits_keep_counters(self):
+        model_admin = AttendanceAdmin(Attendance, admin.site)
+        record = self.mark(self.dbms, 1, Attendance.Status.PRESENT)
+        model_admin.save_model(None, record, None, False)
+        self.assertEqual(self.counter(), (1, 0, 0))
+
+        record.status = Attendance.Status.ABSENT
+        model_admin.save_model(None, record, None, True)
+        self.assertEqual(self.counter(), (0, 1, 0))
+
+        model_admin.delete_model(None, record)
+        self.assertEqual(self.counter(), (0, 0, 0))
+        self.assertEqual(find_counter_mismatches(), [])
+
+    def test_rebuild_command_check_and_repair(self):
+        self.post_mark(1, "PRESENT")
+        SubjectAttendanceCounter.objects.filter(subject=self.dbms).update(present=5)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_attendance_counters", "--check", stdout=StringIO())
+
+        call_command("rebuild_attendance_counters", stdout=StringIO())
+        self.assertEqual(self.counter(), (1, 0, 0))
+        call_command("rebuild_attendance_counters", "--check", stdout=StringIO())
+
+
+class BulkMarkAttendanceTests(AttendanceTestMixin, APITestCase):
+    url = reverse("bulk-mark-attendance")
+
+    def test_bulk_mark_upserts_and_reports_each_item(self):
+        self.mark(self.dbms, 1, Attendance.Status.PRESENT)
+        self.mark(self.dbms, 2, Attendance.Status.ABSENT)
+        rebuild_counters()
+
+        other = User.objects.create_user(
+            username="other", password="pass12345", id_card_number="ID002"
+        )
+        foreign = Subject.objects.create(subject_name="DBMS", owner=other)
+
+        marks = [
+            {"subject": self.dbms.id, "date": "2026-01-01", "status": "ABSENT"},
+            {"subject": self.dbms.id, "date": "2026-01-02", "status": "ABSENT"},
+            {"subject": self.dbms.id, "date": "2026-01-03", "status": "PRESENT"},
+            {"subject": self.os.id, "date": "2026-01-03", "status": "NO_CLASS"},
+            {"subject": self.os.id, "date": "2026-01-03", "status": "PRESENT"},
+            {"subject": foreign.id, "date": "2026-01-03", "status": "PRESENT"},
+            {"subject": self.dbms.id, "date": "2026-01-04", "status": "LATE"},
+        ]
+        response = self.client.post(self.url, {"marks": marks}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        results = [item["result"] for item in response.json()["results"]]
+        self.assertEqual(results, [
+            "updated", "unchanged", "created", "duplicate", "created", "error", "error",
+        ])
+
+        self.assertEqual(
+            Attendance.objects.get(subject=self.os, date=date(2026, 1, 3)).status,
+            Attendance.Status.PRESENT,
+        )
+        self.assertFalse(Attendance.objects.filter(subject=foreign).exists())
+        self.assertEqual(find_counter_mismatches(), [])
+
+    def test_bulk_mark_query_count_is_constant(self):
+        marks = [
+            {"subject": self.dbms.id, "date": f"2026-01-{day:02d}", "status": "PRESENT"}
+            for day in range(1, 29)
+        ]
+        # ownership check, savepoint, locking read, upsert, counter update,
+        # check that no new mark was inserted by someone else first, release
+        with self.assertNumQueries(7):
+            self.client.post(self.url, {"marks": marks}, format="json")
+        self.assertEqual(
+            SubjectAttendanceCounter.objects.get(subject=self.dbms).present, 28
+        )
+
+    def test_marks_inserted_first_by_another_request_are_recounted(self):
+        from django.utils import timezone
+        from .bulk import raced_subjects
+
+        # the row the locking read could not see yet, committed by someone else
+        self.mark(self.dbms, 1, Attendance.Status.PRESENT)
+        ours = [
+            Attendance(subject=self.dbms, date=date(2026, 1, 1), created_at=timezone.now()),
+            Attendance(subject=self.os, date=date(2026, 1, 1), created_at=timezone.now()),
+        ]
+        # and our own insert (auto_now_add ignores created_at, so set it after)
+        self.mark(self.os, 1, Attendance.Status.PRESENT)
+        Attendance.objects.filter(subject=self.os).update(created_at=ours[1].created_at)
+
+        self.assertEqual(raced_subjects(ours), {self.dbms.id})
+
+    def test_bulk_mark_rejects_oversized_batch(self):
+        marks = [{"subject": self.dbms.id, "date": "2026-01-01", "status": "PRESENT"}] * 201
+        response = self.client.post(self.url, {"marks": marks}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class SubjectAttendanceListTests(AttendanceTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        for day in range(1, 11):
+            self.mark(self.dbms, day, Attendance.Status.PRESENT)
+        self.url = reverse("subject-attendance-records", args=[self.dbms.id])
+
+    def dates(self, response):
+        return [row["date"] for row in response.json()]
+
+    def test_without_params_returns_full_list(self):
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.json()), 10)
+        self.assertNotIn("Link", response)
+
+    def test_date_range(self):
+        response = self.client.get(self.url, {"from": "2026-01-03", "to": "2026-01-05"})
+        self.assertEqual(self.dates(response), ["2026-01-05", "2026-01-04", "2026-01-03"])
+
+    def test_keyset_pages_follow_next_cursor(self):
+        response = self.client.get(self.url, {"limit": 4})
+        self.assertEqual(self.dates(response), ["2026-01-10", "2026-01-09", "2026-01-08", "2026-01-07"])
+        self.assertEqual(response["X-Next-Cursor"], "2026-01-07")
+
+        seen = self.dates(response)
+        while "X-Next-Cursor" in response:
+            response = self.client.get(
+                self.url, {"limit": 4, "cursor": response["X-Next-Cursor"]}
+            )
+            seen += self.dates(response)
+
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(len(set(seen)), 10)
+
+    def test_bad_params_are_400(self):
+        self.assertEqual(self.client.get(self.url, {"from": "01/03/2026"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"limit": "x"}).status_code, 400)
+
+
+class SubjectAttendanceMonthTests(AttendanceTestMixin, APITestCase):
+    def test_month_is_encoded_one_char_per_day(self):
+        self.mark(self.dbms, 1, Attendance.Status.PRESENT)
+        self.mark(self.dbms, 2, Attendance.Status.ABSENT)
+        self.mark(self.dbms, 4, Attendance.Status.NO_CLASS)
+        self.mark(self.dbms, 31, Attendance.Status.PRESENT)
+        Attendance.objects.create(
+            subject=self.dbms, date=date(2026, 2, 1), status=Attendance.Status.ABSENT
+        )
+
+        url = reverse("subject-attendance-month", args=[self.dbms.id, 2026, 1])
+        with self.assertNumQueries(2):
+            data = self.client.get(url).json()
+
+        self.assertEqual(len(data["days"]), 31)
+        self.assertEqual(data["days"], "PA-N" + "-" * 26 + "P")
+
+    def test_invalid_month_and_foreign_subject(self):
+        url = reverse("subject-attendance-month", args=[self.dbms.id, 2026, 13])
+        self.assertEqual(self.client.get(url).status_code, 400)
+
+        url = reverse("subject-attendance-month", args=[9999, 2026, 1])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class StatsCacheTests(AttendanceTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.overall_url = reverse("overall-attendance-stats")
+        self.subject_url = reverse("subject-attendance-stats", args=[self.dbms.id])
+
+    def post_mark(self, day, status):
+        # invalidation runs on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("mark-attendance"),
+                {"subject": self.dbms.id, "date": f"2026-01-{day:02d}", "status": status},
+                format="json",
+            )
+
+    def test_second_read_is_served_from_cache(self):
+        self.client.get(self.overall_url)
+        with self.assertNumQueries(0):
+            self.client.get(self.overall_url)
+
+    def test_mark_and_delete_invalidate(self):
+        self.assertEqual(self.client.get(self.subject_url).json()["present"], 0)
+        self.client.get(self.overall_url)
+
+        self.post_mark(1, "PRESENT")
+        self.assertEqual(self.client.get(self.subject_url).json()["present"], 1)
+        self.assertEqual(self.client.get(self.overall_url).json()["present"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(
+                reverse("mark-attendance"),
+                {"subject": self.dbms.id, "date": "2026-01-01"},
+                format="json",
+            )
+        self.assertEqual(self.client.get(self.subject_url).json()["present"], 0)
+        self.assertEqual(self.client.get(self.overall_url).json()["present"], 0)
+
+    def test_subject_delete_invalidates_overall(self):
+        self.post_mark(1, "PRESENT")
+        self.assertEqual(len(self.client.get(self.overall_url).json()["subjects"]), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("subject-detail", args=[self.dbms.id]))
+        stats = self.client.get(self.overall_url).json()
+        self.assertEqual(len(stats["subjects"]), 1)
+        self.assertEqual(stats["present"], 0)
+
+    def test_hit_miss_counters_admin_only(self):
+        self.client.get(self.overall_url)
+        self.client.get(self.overall_url)
+
+        url = reverse("stats-cache")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get(url).json(), {"hits": 1, "misses": 1, "hit_rate": 0.5})
+
+
+class ConditionalRecordsTests(AttendanceTestMixin, APITestCase):
+    def test_matching_etag_is_304_until_records_change(self):
+        self.mark(self.dbms, 1, Attendance.Status.PRESENT)
+        url = reverse("subject-attendance-records", args=[self.dbms.id])
+
+        first = self.client.get(url)
+        etag = first["ETag"]
+        self.assertNotIn("Last-Modified", first)
+
+        # version aggregate only: ownership comes from the cached subject set
+        with self.assertNumQueries(1):
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["ETag"], etag)
+
+        # a different window is a different representation
+        other = self.client.get(url, {"from": "2026-01-02"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(other.status_code, 200)
+
+        Attendance.objects.filter(subject=self.dbms).delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_modified_since_never_hides_a_delete(self):
+        self.mark(self.dbms, 1, Attendance.Status.PRESENT)
+        newest = self.mark(self.dbms, 2, Attendance.Status.PRESENT)
+        url = reverse("subject-attendance-records", args=[self.dbms.id])
+        since = http_date(time.time() + 60)
+
+        newest.delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+
+class QueryPlanTests(APITestCase):
+    """
+    Sends the hot read requests on a seeded dataset, EXPLAINs the SQL the
+    views actually ran and asserts that none of it scans the whole
+    attendance table.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        from datetime import timedelta
+        from django.utils import timezone
+        from timetable.models import Timetable
+
+        start = date(2025, 8, 1)
+        statuses = list(Attendance.Status)
+        for n in range(5):
+            user = User.objects.create_user(
+                username=f"seed{n}", password="pass12345", id_card_number=f"SEED{n}"
+            )
+            for s in range(6):
+                subject = Subject.objects.create(subject_name=f"Subject {s}", owner=user)
+                Timetable.objects.bulk_create([
+                    Timetable(subject=subject, day_of_week=day)
+                    for day in ("MON", "WED", "FRI")
+                ])
+                Attendance.objects.bulk_create([
+                    Attendance(
+                        subject=subject,
+                        date=start + timedelta(days=d),
+                        status=statuses[(d + s) % 3],
+                    )
+                    for d in range(120)
+                ])
+        cls.user = user
+        cls.subject = subject
+        cls.seeded_at = timezone.now()
+
+    def hot_requests(self):
+        from .sync import encode_token
+
+        records = reverse("subject-attendance-records", args=[self.subject.id])
+        export = reverse("attendance-export")
+        return {
+            "calendar window": lambda: self.client.get(
+                records, {"from": "2025-09-01", "to": "2025-09-30", "limit": 10}
+            ),
+            "calendar month": lambda: self.client.get(
+                reverse("subject-attendance-month", args=[self.subject.id, 2025, 9])
+            ),
+            "analytics": lambda: self.client.get(
+                reverse("attendance-analytics"), {"subject": self.subject.id}
+            ),
+            "change feed": lambda: self.client.get(
+                reverse("change-feed"), {"cursor": encode_token(self.seeded_at)}
+            ),
+            "export": lambda: b"".join(
+                self.client.get(export, {"subject": self.subject.id}).streaming_content
+            ),
+            "counter rebuild": lambda: rebuild_counters([self.subject.id]),
+        }
+
+    def explain(self, connection, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(f"EXPLAIN {sql}")
+            else:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+    def test_hot_queries_use_indexes(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client.force_authenticate(self.user)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        # attendance is the table that grows with every class day; subjects
+        # and timetable rows are a handful per user, where a sequential scan
+        # is the planner's right call
+        table = Attendance._meta.db_table
+        full_scan = (
+            rf"Seq Scan on {table}\b" if connection.vendor == "postgresql"
+            # sqlite: "SCAN t" walks a whole table or index, "SEARCH t" seeks
+            else rf"\bSCAN {table}\b"
+        )
+        for name, send in self.hot_requests().items():
+            cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                send()
+            sql = [
+                query["sql"] for query in captured.captured_queries
+                if query["sql"].startswith("SELECT") and table in query["sql"]
+            ]
+            with self.subTest(name):
+                self.assertTrue(sql, "no attendance query was sent")
+            for statement in sql:
+                plan = self.explain(connection, statement)
+                with self.subTest(name, sql=statement, plan=plan):
+                    self.assertNotRegex(plan, full_scan)
+
+
+class ProjectionTests(AttendanceTestMixin, APITestCase):
+    def test_count_weekday_matches_day_by_day(self):
+        from datetime import timedelta
+        from .utils import count_weekday
+
+        start = date(2026, 1, 1)
+        for length in range(0, 40):
+            end = start + timedelta(days=length)
+            for weekday in range(7):
+                expected = sum(
+                    1 for d in range(length + 1)
+                    if (start + timedelta(days=d)).weekday() == weekday
+                )
+                self.assertEqual(count_weekday(start, end, weekday), expected)
+        self.assertEqual(count_weekday(start, start - timedelta(days=1), 0), 0)
+
+    def test_project_attendance(self):
+        from fractions import Fraction
+        from .utils import project_attendance
+
+        target = Fraction(3, 4)
+        # 6/8 now, 8 more classes: finishing 12/16 means 2 can be skipped
+        result = project_attendance(6, 2, 8, target)
+        self.assertEqual(result["can_skip"], 2)
+        self.assertEqual(result["must_attend"], 0)
+
+        # 2/6 now: needs (2 + x) / (6 + x) >= 0.75 -> x = 10
+        result = project_attendance(2, 4, 12, target)
+        self.assertEqual(result["must_attend"], 10)
+        self.assertTrue(result["reachable"])
+        self.assertEqual(result["can_skip"], 0)
+
+        result = project_attendance(0, 10, 5, target)
+        self.assertIsNone(result["can_skip"])
+        self.assertFalse(result["reachable"])
+
+    def test_projection_endpoint(self):
+        from timetable.models import Timetable
+
+        for day in (1, 2, 3):
+            self.mark(self.dbms, day, Attendance.Status.PRESENT)
+        self.mark(self.dbms, 4, Attendance.Status.ABSENT)
+        rebuild_counters()
+        Timetable.objects.create(subject=self.dbms, day_of_week="MON")
+        Timetable.objects.create(subject=self.dbms, day_of_week="THU")
+
+        # 2026-01-05 (Mon) .. 2026-01-18 (Sun): two Mondays, two Thursdays
+        response = self.client.get(reverse("attendance-projection"), {
+            "from": "2026-01-05", "until": "2026-01-18", "target": "75",
+        })
+        by_name = {row["subject_name"]: row for row in response.json()["subjects"]}
+        self.assertEqual(by_name["DBMS"]["upcoming_classes"], 4)
+        # 3/4 now, finishing (3 + 4 - k) / 8 >= 0.75 -> k = 1
+        self.assertEqual(by_name["DBMS"]["can_skip"], 1)
+        self.assertEqual(by_name["OS"]["upcoming_classes"], 0)
+
+        self.assertEqual(self.client.get(reverse("attendance-projection")).status_code, 400)
+        self.assertEqual(
+            self.client.get(reverse("attendance-projection"), {"until": "2026-05-01", "target": "150"}).status_code,
+            400,
+        )
+
+
+class MissingAttendanceCommandTests(AttendanceTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        from timetable.models import Timetable
+
+        # 2026-01-05 is a Monday
+        Subject.objects.update(created_at=datetime(2026, 1, 1, tzinfo=dt_timezone.utc))
+        Timetable.objects.create(subject=self.dbms, day_of_week="MON")
+        Timetable.objects.create(subject=self.dbms, day_of_week="WED")
+        self.mark(self.dbms, 5, Attendance.Status.PRESENT)
+        rebuild_counters()
+
+    def run_command(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command(
+            "find_missing_attendance", "--from", "2026-01-05", "--to", "2026-01-18",
+            *args, stdout=out, stderr=err,
+        )
+        return out.getvalue().splitlines()[1:]
+
+    def test_lists_scheduled_days_without_marks(self):
+        rows = self.run_command()
+        self.assertEqual(
+            [row.split(",")[2] for row in rows],
+            ["2026-01-07", "2026-01-12", "2026-01-14"],
+        )
+
+    def test_fill_inserts_no_class_and_keeps_counters(self):
+        self.run_command("--fill", "--chunk-size", "1")
+        self.assertEqual(
+            Attendance.objects.filter(subject=self.dbms, status=Attendance.Status.NO_CLASS).count(), 3
+        )
+        self.assertEqual(find_counter_mismatches(), [])
+        self.assertEqual(self.run_command(), [])
+
+    def test_days_before_the_subject_existed_are_not_missing(self):
+        Subject.objects.filter(id=self.dbms.id).update(
+            created_at=datetime(2026, 1, 10, 12, tzinfo=dt_timezone.utc)
+        )
+        rows = self.run_command("--fill")
+        self.assertEqual([row.split(",")[2] for row in rows], ["2026-01-12", "2026-01-14"])
+        self.assertFalse(Attendance.objects.filter(date=date(2026, 1, 7)).exists())
+
+    def test_fresh_run_overwrites_the_report(self):
+        import tempfile
+        from pathlib import Path
+
+        with tempfile.TemporaryDirectory() as tmp:
+            report = Path(tmp) / "missing.csv"
+            for _ in range(2):
+                call_command(
+                    "find_missing_attendance", "--from", "2026-01-05", "--to", "2026-01-18",
+                    "--output", str(report), stderr=StringIO(),
+                )
+            lines = report.read_text().splitlines()
+        self.assertEqual(lines[0], "user_id,subject_id,date")
+        self.assertEqual(len(lines), 4)
+
+    def test_resumes_from_state_file(self):
+        import tempfile
+        from pathlib import Path
+
+        other = User.objects.create_user(
+            username="other", password="pass12345", id_card_number="ID002"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            state = Path(tmp) / "state.json"
+            state.write_text('{"last_user_id": %d}' % self.user.id)
+            # everything up to self.user is done; only the other user is left
+            self.assertEqual(self.run_command("--state", str(state)), [])
+            self.assertFalse(state.exists())
+        self.assertGreater(other.id, self.user.id)
+
+
+class AttendanceExportTests(AttendanceTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.mark(self.dbms, 1, Attendance.Status.PRESENT)
+        self.mark(self.dbms, 2, Attendance.Status.ABSENT)
+        self.mark(self.os, 1, Attendance.Status.PRESENT)
+        other = User.objects.create_user(
+            username="other", password="pass12345", id_card_number="ID002"
+        )
+        foreign = Subject.objects.create(subject_name="Foreign", owner=other)
+        self.mark(foreign, 1, Attendance.Status.PRESENT)
+        self.url = reverse("attendance-export")
+
+    def body(self, response):
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        lines = self.body(self.client.get(self.url)).splitlines()
+        self.assertEqual(lines[0], "subject,subject_name,subject_code,date,status,updated_at")
+        self.assertEqual(len(lines), 4)
+        self.assertNotIn("Foreign", "".join(lines))
+
+    def test_ndjson_with_filters(self):
+        import json
+
+        response = self.client.get(self.url, {
+            "type": "ndjson", "subject": self.dbms.id, "status": "ABSENT", "from": "2026-01-01",
+        })
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in self.body(response).splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual((rows[0]["subject_name"], rows[0]["date"]), ("DBMS", "2026-01-02"))
+
+    def test_invalid_filters(self):
+        for params in ({"type": "xml"}, {"status": "LATE"}, {"subject": "abc"}):
+            with self.subTest(params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+
+class CsvImportTests(AttendanceTestMixin, APITestCase):
+    def upload(self, content, **data):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        csv_file = SimpleUploadedFile("import.csv", content.encode(), content_type="text/csv")
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse("attendance-import"), {"file": csv_file, **data}, format="multipart"
+            )
+
+    def test_import_attendance_creates_subjects_and_reports_errors(self):
+        self.mark(self.dbms, 1, Attendance.Status.ABSENT)
+        rebuild_counters()
+        stats_url = reverse("subject-attendance-stats", args=[self.dbms.id])
+        self.client.get(stats_url)  # cached before the import
+
+        response = self.upload(
+            "subject_name,date,status\n"
+            "DBMS,2026-01-01,PRESENT\n"
+            "DBMS,2026-01-02,present\n"
+            "Maths,2026-01-01,ABSENT\n"
+            "Maths,2026-13-01,ABSENT\n"
+            ",2026-01-03,LATE\n"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual((report["rows"], report["imported"], report["error_count"]), (5, 3, 2))
+        self.assertEqual(report["created_subjects"], ["Maths"])
+        self.assertEqual([error["line"] for error in report["errors"]], [5, 6])
+        self.assertEqual(set(report["errors"][1]["errors"]), {"subject_name", "status"})
+
+        maths = Subject.objects.get(owner=self.user, subject_name="Maths")
+        self.assertEqual(self.client.get(stats_url).json()["present"], 2)
+        self.assertEqual(find_counter_mismatches([self.dbms.id, maths.id]), [])
+
+    def test_import_in_chunks_matches_row_by_row(self):
+        from .importer import CsvImporter
+
+        rows = ["subject_name,date,status"] + [
+            f"{name},2026-0{month}-{day:02d},{status}"
+            for name in ("DBMS", "OS", "Networks")
+            for month in (1, 2)
+            for day, status in zip(range(1, 29), ["PRESENT", "ABSENT", "NO_CLASS", "PRESENT"] * 7)
+        ]
+        report = CsvImporter(self.user, "attendance", chunk_size=50).run(rows)
+
+        self.assertEqual((report["imported"], report["error_count"]), (168, 0))
+        self.assertEqual(Attendance.objects.filter(subject__owner=self.user).count(), 168)
+        self.assertEqual(Subject.objects.filter(owner=self.user).count(), 3)
+        self.assertEqual(find_counter_mismatches(), [])
+
+    def test_import_timetable_upserts_slots(self):
+        from timetable.models import Timetable
+
+        Timetable.objects.create(subject=self.dbms, day_of_week="MON")
+        response = self.upload(
+            "subject_name,day_of_week,start_time,end_time\n"
+            "DBMS,MON,09:00,10:00\n"
+            "Physics,wed,,\n"
+            "OS,XYZ,09:00,08:00\n",
+            kind="timetable",
+        )
+
+        report = response.json()
+        self.assertEqual((report["imported"], report["error_count"]), (2, 1))
+        self.assertEqual(set(report["errors"][0]["errors"]), {"day_of_week", "end_time"})
+        slot = Timetable.objects.get(subject=self.dbms)
+        self.assertEqual(slot.start_time.isoformat(), "09:00:00")
+        self.assertTrue(
+            Timetable.objects.filter(subject__subject_name="Physics", day_of_week="WED").exists()
+        )
+
+    def test_missing_columns_or_file(self):
+        self.assertEqual(self.upload("subject_name,date\nDBMS,2026-01-01\n").status_code, 400)
+        self.assertEqual(self.client.post(reverse("attendance-import"), {}).status_code, 400)
+        self.assertEqual(self.upload("subject_name\n", kind="grades").status_code, 400)
+
+    def test_management_command(self):
+        import tempfile
+        from pathlib import Path
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as fh:
+            fh.write("subject_name,date,status\nOS,2026-01-05,PRESENT\nOS,bad,PRESENT\n")
+        self.addCleanup(Path(fh.name).unlink)
+
+        out, err = StringIO(), StringIO()
+        call_command("import_attendance_csv", fh.name, user="student", stdout=out, stderr=err)
+
+        self.assertIn("Imported 1 of 2 rows (1 errors)", out.getvalue())
+        self.assertIn("line 3: date", err.getvalue())
+        self.assertEqual(self.os.attendance_records.count(), 1)
+        with self.assertRaises(CommandError):
+            call_command("import_attendance_csv", fh.name, user="nobody")
+
+
+class DashboardTests(AttendanceTestMixin, APITestCase):
+    def setUp(self):
+        from timetable.models import Timetable
+
+        super().setUp()
+        self.mark(self.dbms, 1, Attendance.Status.PRESENT)
+        self.mark(self.dbms, 2, Attendance.Status.ABSENT)
+        self.mark(self.os, 1, Attendance.Status.PRESENT)
+        rebuild_counters()
+        Timetable.objects.create(subject=self.dbms, day_of_week="MON", start_time="11:00")
+        Timetable.objects.create(subject=self.dbms, day_of_week="FRI", start_time="09:00")
+        Timetable.objects.create(subject=self.os, day_of_week="MON", start_time="09:00")
+
+    def get(self):
+        from datetime import datetime, timezone as dt_timezone
+        from unittest import mock
+
+        # 2026-01-05 08:00 UTC is a Monday morning
+        moment = datetime(2026, 1, 5, 8, 0, tzinfo=dt_timezone.utc)
+        with mock.patch("timetable.schedule.timezone.now", return_value=moment):
+            return self.client.get(reverse("dashboard")).json()
+
+    def test_dashboard_payload(self):
+        data = self.get()
+
+        self.assertEqual(data["version"], 1)
+        self.assertEqual(data["today"], "MON")
+        overall = self.client.get(reverse("overall-attendance-stats")).json()
+        overall.pop("subjects")
+        self.assertEqual(data["overall"], overall)
+        dbms = data["subjects"][0]
+        self.assertEqual((dbms["subject_name"], dbms["stats"]["percentage"]), ("DBMS", 50.0))
+        self.assertEqual([slot["day_of_week"] for slot in dbms["timetable"]], ["MON", "FRI"])
+        self.assertEqual([slot["subject_name"] for slot in data["today_classes"]], ["OS", "DBMS"])
+        self.assertEqual((data["next"]["subject_name"], data["next"]["date"]), ("OS", "2026-01-05"))
+
+    def test_query_count_does_not_grow_with_subjects(self):
+        from timetable.models import Timetable
+
+        with self.assertNumQueries(2):
+            self.get()
+
+        for n in range(10):
+            subject = Subject.objects.create(subject_name=f"Extra {n}", owner=self.user)
+            Timetable.objects.create(subject=subject, day_of_week="TUE")
+            self.mark(subject, 3, Attendance.Status.PRESENT)
+        rebuild_counters()
+
+        with self.assertNumQueries(2):
+            data = self.get()
+        self.assertEqual(len(data["subjects"]), 12)
+        self.assertEqual(data["overall"]["present"], 12)
+
+    def test_subject_without_a_counter_is_counted_from_its_records(self):
+        before = self.get()
+        SubjectAttendanceCounter.objects.filter(subject=self.dbms).delete()
+
+        data = self.get()
+        self.assertEqual(data["subjects"][0]["stats"], before["subjects"][0]["stats"])
+        self.assertEqual(data["overall"], before["overall"])
+        counter = SubjectAttendanceCounter.objects.get(subject=self.dbms)
+        self.assertEqual((counter.present, counter.absent), (1, 1))
+        # stored, so the next load is back to two queries
+        with self.assertNumQueries(2):
+            self.get()
+
+
+class AnalyticsTests(AttendanceTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        # 2026-01-01 is a Thursday
+        for day, status in [(1, "PRESENT"), (2, "ABSENT"), (5, "PRESENT"), (6, "PRESENT")]:
+            self.mark(self.dbms, day, status)
+        for day in (1, 2, 5, 6, 7):
+            self.mark(self.os, day, Attendance.Status.PRESENT)
+        Attendance.objects.create(subject=self.os, date=date(2026, 2, 2), status="PRESENT")
+        Attendance.objects.create(subject=self.dbms, date=date(2026, 2, 2), status="PRESENT")
+        self.url = reverse("attendance-analytics")
+
+    def analytics(self, today, **kwargs):
+        from .analytics import build_analytics
+
+        return build_analytics(self.user, today=today, **kwargs)
+
+    def test_buckets_and_streaks(self):
+        data = self.client.get(self.url).json()
+        overall = data["overall"]
+
+        self.assertEqual(
+            [(w["week"], w["present"], w["absent"]) for w in overall["weekly"]],
+            [("2025-12-29", 3, 1), ("2026-01-05", 5, 0), ("2026-02-02", 2, 0)],
+        )
+        self.assertEqual([m["month"] for m in overall["monthly"]], ["2026-01", "2026-02"])
+        self.assertEqual(overall["monthly"][0]["percentage"], 88.89)
+        friday = next(day for day in overall["weekday"] if day["day"] == "FRI")
+        self.assertEqual((friday["absent"], friday["absence_rate"]), (1, 50.0))
+        # overall a day with any absence breaks the streak: Jan 5, 6, 7, Feb 2
+        self.assertEqual(overall["streaks"], {"current": 4, "longest": 4})
+
+        dbms, os_ = data["subjects"]
+        self.assertEqual(dbms["subject_name"], "DBMS")
+        self.assertEqual(dbms["streaks"], {"current": 3, "longest": 3})
+        self.assertEqual(os_["streaks"], {"current": 6, "longest": 6})
+
+    def test_filters(self):
+        response = self.client.get(self.url, {"subject": self.dbms.id, "from": "2026-01-02", "to": "2026-01-31"})
+        data = response.json()
+
+        self.assertEqual([s["subject_name"] for s in data["subjects"]], ["DBMS"])
+        self.assertEqual(data["overall"]["monthly"][0]["total"], 3)
+        self.assertEqual(data["overall"]["streaks"], {"current": 2, "longest": 2})
+
+        other = User.objects.create_user(username="other", password="pass12345", id_card_number="ID002")
+        foreign = Subject.objects.create(subject_name="X", owner=other)
+        self.assertEqual(self.client.get(self.url, {"subject": foreign.id}).status_code, 404)
+        self.assertEqual(self.client.get(self.url, {"from": "2026-02-01", "to": "2026-01-01"}).status_code, 400)
+
+    def test_closed_and_open_parts_merge_like_one_range(self):
+        # nothing closed yet vs January closed and February open
+        everything_open = self.analytics(date(2025, 12, 1))
+        cache.clear()
+        self.assertEqual(self.analytics(date(2026, 2, 10)), everything_open)
+
+    def test_closed_periods_are_cached(self):
+        today = date(2026, 2, 10)
+        self.analytics(today)
+        # open part (5 grouped queries) and the subject names
+        with self.assertNumQueries(6):
+            self.analytics(today)
+
+    def test_editing_the_past_drops_the_cached_periods(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("mark-attendance"),
+                {"subject": self.os.id, "date": "2026-01-06", "status": "ABSENT"},
+                format="json",
+            )
+
+        data = self.client.get(self.url).json()
+        self.assertEqual(data["subjects"][1]["streaks"], {"current": 2, "longest": 3})
+
+
+class CohortReportTests(AttendanceTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user.is_staff = True
+        self.user.save()
+        # DBMS 1/3 present, OS 3/3 present
+        self.mark(self.dbms, 1, Attendance.Status.PRESENT)
+        self.mark(self.dbms, 2, Attendance.Status.ABSENT)
+        self.mark(self.dbms, 5, Attendance.Status.ABSENT)
+        self.mark(self.dbms, 6, Attendance.Status.NO_CLASS)
+        for day in (1, 2, 5):
+            self.mark(self.os, day, Attendance.Status.PRESENT)
+        for n in range(3):
+            student = User.objects.create_user(
+                username=f"s{n}", password="pass12345", id_card_number=f"S{n}"
+            )
+            maths = Subject.objects.create(subject_name="Maths", owner=student)
+            # s0 3/4, s1 2/4, s2 1/4 present
+            for day in range(1, 5):
+                self.mark(maths, day, "PRESENT" if day <= 3 - n else "ABSENT")
+        rebuild_counters()
+
+    def report(self, **params):
+        response = self.client.get(reverse("cohort-report"), params)
+        self.assertEqual(response.status_code, 200)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        return [line.split(",") for line in lines[1:]]
+
+    def test_lists_subjects_below_threshold_for_every_user(self):
+        rows = self.report()
+
+        self.assertEqual(
+            [(row[1], row[4], row[8]) for row in rows],
+            [("student", "DBMS", "33.33"), ("s1", "Maths", "50.0"), ("s2", "Maths", "25.0")],
+        )
+        self.assertEqual(rows[0][2], "ID001")
+        self.assertEqual([row[1] for row in self.report(threshold=40)], ["student", "s2"])
+
+    def test_date_range_counts_the_raw_records(self):
+        rows = self.report(**{"from": "2026-01-02", "to": "2026-01-04"})
+
+        # in range: DBMS 0/1, s0 2/3, s1 1/3, s2 0/3
+        self.assertEqual(
+            [(row[1], row[8]) for row in rows],
+            [("student", "0.0"), ("s0", "66.67"), ("s1", "33.33"), ("s2", "0.0")],
+        )
+
+    def test_chunks_give_the_same_report(self):
+        from .cohort import cohort_rows
+
+        self.assertEqual(list(cohort_rows(chunk_size=1)), list(cohort_rows()))
+        # one query for the user ids and one for the rows of each range
+        with self.assertNumQueries(3):
+            list(cohort_rows(chunk_size=10))
+
+    def test_admin_only_and_validation(self):
+        self.assertEqual(self.client.get(reverse("cohort-report"), {"threshold": "x"}).status_code, 400)
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse("cohort-report")).status_code, 403)
+
+    def test_command_reports_runtime_and_memory(self):
+        out, err = StringIO(), StringIO()
+        call_command("cohort_report", "--chunk-size", "2", stdout=out, stderr=err)
+
+        self.assertEqual(len(out.getvalue().splitlines()), 4)
+        self.assertIn("3 subjects of 3 students below 75%", err.getvalue())
+        self.assertIn("peak memory", err.getvalue())
+
+
+class SyncTests(AttendanceTestMixin, APITestCase):
+    def sync(self, changes=(), token=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("attendance-sync"), {"changes": list(changes), "token": token}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def change(self, key, day, status, client_time="2030-01-01T00:00:00Z", subject=None):
+        return {
+            "key": key,
+            "subject": (subject or self.dbms).id,
+            "date": f"2026-01-{day:02d}",
+            "status": status,
+            "client_time": client_time,
+        }
+
+    def counter(self):
+        counter = SubjectAttendanceCounter.objects.get(subject=self.dbms)
+        return (counter.present, counter.absent, counter.no_class)
+
+    def test_changes_are_applied_in_one_batch(self):
+        self.mark(self.dbms, 2, Attendance.Status.PRESENT)
+        rebuild_counters()
+
+        data = self.sync([
+            self.change("a", 1, "PRESENT"),
+            self.change("b", 2, "ABSENT"),
+            self.change("c", 3, "PRESENT"),
+            self.change("d", 3, None),
+            self.change("e", 4, None),
+        ])
+
+        self.assertEqual(
+            [result["result"] for result in data["results"]],
+            ["applied", "applied", "applied", "applied", "unchanged"],
+        )
+        self.assertEqual(
+            dict(Attendance.objects.values_list("date__day", "status")),
+            {1: "PRESENT", 2: "ABSENT"},
+        )
+        self.assertEqual(self.counter(), (1, 1, 0))
+        self.assertEqual(find_counter_mismatches(), [])
+
+    def test_replayed_keys_do_not_write_twice(self):
+        self.sync([self.change("a", 1, "PRESENT")])
+        self.client.delete(
+            reverse("mark-attendance"), {"subject": self.dbms.id, "date": "2026-01-01"}, format="json"
+        )
+
+        data = self.sync([self.change("a", 1, "PRESENT"), self.change("a", 1, "PRESENT")])
+
+        self.assertEqual(data["results"][0]["result"], "applied")
+        self.assertTrue(data["results"][0]["replayed"])
+        self.assertEqual(data["results"][1]["result"], "duplicate")
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_newer_server_state_wins(self):
+        self.mark(self.dbms, 1, Attendance.Status.ABSENT)
+
+        data = self.sync([
+            self.change("old", 1, "PRESENT", client_time="2020-01-01T00:00:00Z"),
+            self.change("new", 2, "PRESENT", client_time="2020-01-01T00:00:00Z"),
+        ])
+
+        conflict, applied = data["results"]
+        self.assertEqual((conflict["result"], conflict["server"]["status"]), ("conflict", "ABSENT"))
+        self.assertEqual(applied["result"], "applied")
+        self.assertEqual(Attendance.objects.get(date=date(2026, 1, 1)).status, "ABSENT")
+
+    def test_latest_edit_wins_whichever_device_syncs_first(self):
+        earlier, later = "2026-01-01T10:00:00Z", "2026-01-01T11:00:00Z"
+
+        # device A edited later and syncs first; B's older edit must not replace it
+        self.sync([self.change("a1", 1, "PRESENT", client_time=later)])
+        data = self.sync([self.change("b1", 1, "ABSENT", client_time=earlier)])
+        self.assertEqual(data["results"][0]["result"], "conflict")
+        self.assertEqual(Attendance.objects.get(date=date(2026, 1, 1)).status, "PRESENT")
+
+        # B's older edit syncs first this time; A's later one still applies
+        self.sync([self.change("b2", 2, "ABSENT", client_time=earlier)])
+        data = self.sync([self.change("a2", 2, "PRESENT", client_time=later)])
+        self.assertEqual(data["results"][0]["result"], "applied")
+        self.assertEqual(Attendance.objects.get(date=date(2026, 1, 2)).status, "PRESENT")
+
+        # removals carry the device's time too
+        self.sync([self.change("b3", 2, None, client_time="2026-01-01T12:00:00Z")])
+        data = self.sync([self.change("a3", 2, "ABSENT", client_time=later)])
+        self.assertEqual(data["results"][0]["result"], "conflict")
+        self.assertFalse(Attendance.objects.filter(date=date(2026, 1, 2)).exists())
+        self.assertEqual(find_counter_mismatches(), [])
+
+    def test_server_removal_after_the_change_wins(self):
+        self.sync([self.change("a", 1, "PRESENT")])
+        self.client.delete(
+            reverse("mark-attendance"), {"subject": self.dbms.id, "date": "2026-01-01"}, format="json"
+        )
+
+        data = self.sync([self.change("b", 1, "ABSENT", client_time="2020-01-01T00:00:00Z")])
+
+        self.assertEqual(data["results"][0]["result"], "conflict")
+        self.assertIsNone(data["results"][0]["server"]["status"])
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_delta_since_token(self):
+        self.mark(self.dbms, 1, Attendance.Status.PRESENT)
+        first = self.sync()
+        self.assertEqual(len(first["changes"]["upserted"]), 1)
+
+        with self.settings(SYNC_TOKEN_OVERLAP=0):
+            token = self.sync()["token"]
+            self.client.post(
+                reverse("mark-attendance"),
+                {"subject": self.os.id, "date": "2026-01-02", "status": "ABSENT"},
+                format="json",
+            )
+            self.client.delete(
+                reverse("mark-attendance"), {"subject": self.dbms.id, "date": "2026-01-01"}, format="json"
+            )
+            delta = self.sync(token=token)["changes"]
+
+        self.assertEqual([(row["subject"], row["status"]) for row in delta["upserted"]], [(self.os.id, "ABSENT")])
+        self.assertEqual([(row["subject"], row["date"]) for row in delta["deleted"]], [(self.dbms.id, "2026-01-01")])
+
+    def test_invalid_items_and_tokens(self):
+        other = User.objects.create_user(username="other", password="pass12345", id_card_number="ID002")
+        foreign = Subject.objects.create(subject_name="X", owner=other)
+
+        data = self.sync([self.change("a", 1, "LATE"), self.change("b", 1, "PRESENT", subject=foreign)])
+
+        self.assertEqual([result["result"] for result in data["results"]], ["error", "error"])
+        self.assertFalse(Attendance.objects.exists())
+        response = self.client.post(reverse("attendance-sync"), {"token": "yesterday"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class ChangeFeedTests(AttendanceTestMixin, APITestCase):
+    def setUp(self):
+        from timetable.models import Timetable
+
+        super().setUp()
+        self.mark(self.dbms, 1, Attendance.Status.PRESENT)
+        self.mark(self.dbms, 2, Attendance.Status.ABSENT)
+        Timetable.objects.create(subject=self.dbms, day_of_week="MON", start_time="09:00")
+        Timetable.objects.create(subject=self.dbms, day_of_week="WED")
+
+    def feed(self, cursor=None):
+        params = {"cursor": cursor} if cursor else {}
+        response = self.client.get(reverse("change-feed"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_first_call_returns_everything(self):
+        data = self.feed()
+
+        self.assertEqual([row["subject_name"] for row in data["subjects"]["upserted"]], ["DBMS", "OS"])
+        self.assertEqual(len(data["timetable"]["upserted"]), 2)
+        self.assertEqual(len(data["attendance"]["upserted"]), 2)
+        self.assertEqual(data["subjects"]["deleted"], [])
+
+    @override_settings(SYNC_TOKEN_OVERLAP=0)
+    def test_only_changes_since_the_cursor(self):
+        cursor = self.feed()["cursor"]
+
+        self.client.patch(reverse("subject-detail", args=[self.dbms.id]), {"subject_name": "Databases"}, format="json")
+        self.client.delete(reverse("subject-detail", args=[self.os.id]))
+        self.client.post(
+            reverse("bulk-add-timetable", args=[self.dbms.id]),
+            {"slots": [{"day_of_week": "MON", "start_time": "09:00"}]},
+            format="json",
+        )
+        self.client.delete(reverse("mark-attendance"), {"subject": self.dbms.id, "date": "2026-01-02"}, format="json")
+        data = self.feed(cursor)
+
+        self.assertEqual([row["subject_name"] for row in data["subjects"]["upserted"]], ["Databases"])
+        self.assertEqual([row["id"] for row in data["subjects"]["deleted"]], [self.os.id])
+        self.assertEqual(data["timetable"]["upserted"], [])
+        self.assertEqual([row["day_of_week"] for row in data["timetable"]["deleted"]], ["WED"])
+        self.assertEqual(data["attendance"]["upserted"], [])
+        self.assertEqual([row["date"] for row in data["attendance"]["deleted"]], ["2026-01-02"])
+
+        # nothing changed since: empty lists from six small queries
+        with self.assertNumQueries(6):
+            data = self.feed(data["cursor"])
+        self.assertFalse(any(part["upserted"] or part["deleted"] for key, part in data.items() if key != "cursor"))
+
+    def test_cursor_is_validated(self):
+        response = self.client.get(reverse("change-feed"), {"cursor": "abc"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_deleting_the_account_leaves_no_tombstones(self):
+        from subjects.models import SubjectTombstone
+
+        self.user.delete()
+        self.assertFalse(SubjectTombstone.objects.exists())
@@ -1,21 +1,57 @@
 from django.urls import path
 from .views import (
     MarkAttendanceView,
+    BulkMarkAttendanceView,
+    SyncAttendanceView,
     SubjectAttendanceListView,
+    SubjectAttendanceMonthView,
     SubjectAttendanceStatsView,
     OverallAttendanceStatsView,
+    StatsCacheView,
+    AttendanceProjectionView,
+    AttendanceAnalyticsView,
+    AttendanceExportView,
+    ImportCsvView,
+    CohortReportView,
 )
 
 urlpatterns = [
     # Mark or update attendance for a subject on a specific date
     path("mark/", MarkAttendanceView.as_view(), name="mark-attendance"),
 
+    # Mark or update many (subject, date, status) entries in one request
+    path("mark/bulk/", BulkMarkAttendanceView.as_view(), name="bulk-mark-attendance"),
+
+    # Offline sync: queued changes in, changes since the last sync token out
+    path("sync/", SyncAttendanceView.as_view(), name="attendance-sync"),
+
     # Get all attendance records for a subject (calendar view)
     path("subject/<int:subject_id>/records/", SubjectAttendanceListView.as_view(), name="subject-attendance-records"),
 
+    # Compact date -> status string for one calendar month
+    path("subject/<int:subject_id>/month/<int:year>/<int:month>/", SubjectAttendanceMonthView.as_view(), name="subject-attendance-month"),
+
     # Get stats (present, absent, percentage) for a subject
     path("subject/<int:subject_id>/stats/", SubjectAttendanceStatsView.as_view(), name="subject-attendance-stats"),
 
     # Get overall attendance stats for the user (dashboard)
     path("overall-stats/", OverallAttendanceStatsView.as_view(), name="overall-attendance-stats"),
+
+    # How many classes can be skipped / must be attended until the semester ends
+    path("projection/", AttendanceProjectionView.as_view(), name="attendance-projection"),
+
+    # Weekly/monthly trends, weekday pattern and streaks, per subject and overall
+    path("analytics/", AttendanceAnalyticsView.as_view(), name="attendance-analytics"),
+
+    # Stream the attendance history as CSV or NDJSON
+    path("export/", AttendanceExportView.as_view(), name="attendance-export"),
+
+    # Import attendance or timetable rows from a CSV file
+    path("import/", ImportCsvView.as_view(), name="attendance-import"),
+
+    # Students below an attendance threshold across all users, as CSV (admin only)
+    path("cohort-report/", CohortReportView.as_view(), name="cohort-report"),
+
+    # Hit/miss counters of the stats cache (admin only)
+    path("stats-cache/", StatsCacheView.as_view(), name="stats-cache"),
 ]
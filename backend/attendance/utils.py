@@ -1,9 +1,79 @@
+import math
+from fractions import Fraction
+
+from django.db.models import Count, Q
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
 from .models import Attendance
+from subjects.models import Subject
+from backend.db_routing import use_primary
+
+
+def parse_date_param(request, name):
+    """
+    Read an optional YYYY-MM-DD query parameter.
+    Returns None when it is missing and raises a 400 when it is malformed.
+    """
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: ["Use the YYYY-MM-DD format."]})
+    return parsed
+
+
+def parse_date_value(value, name="date"):
+    """
+    Parse a required date from a request body, same formats as
+    parse_date_param; raises a 400 when it is malformed.
+    """
+    try:
+        parsed = parse_date(str(value))
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: ["Use the YYYY-MM-DD format."]})
+    return parsed
+
+
+def filter_date_range(records, request):
+    # optional ?from=YYYY-MM-DD&to=YYYY-MM-DD, both inclusive
+    start = parse_date_param(request, "from")
+    end = parse_date_param(request, "to")
+    if start:
+        records = records.filter(date__gte=start)
+    if end:
+        records = records.filter(date__lte=end)
+    return records
+
+
+# one character per day in the compact month format; "-" means not marked
+STATUS_CODES = {
+    Attendance.Status.PRESENT: "P",
+    Attendance.Status.ABSENT: "A",
+    Attendance.Status.NO_CLASS: "N",
+}
+UNMARKED_CODE = "-"
+
 
-def calculate_stats(records):
-    present = records.filter(status=Attendance.Status.PRESENT).count()
-    absent = records.filter(status=Attendance.Status.ABSENT).count()
+def encode_month(rows, days_in_month):
+    """
+    Turn (date, status) rows of one month into a string with one character
+    per day, e.g. "PPA-N..." where index 0 is the 1st of the month.
+    """
+    days = [UNMARKED_CODE] * days_in_month
+    for day, status_value in rows:
+        days[day.day - 1] = STATUS_CODES.get(status_value, UNMARKED_CODE)
+    return "".join(days)
 
+
+def build_stats(present, absent, no_class=0):
+    # NO_CLASS days are reported but never count towards the percentage
     total = present + absent
     #if percentage > 0 then give percentage value if not give 0
     percentage = round((present / total) * 100, 2) if total > 0 else 0
@@ -11,6 +81,153 @@ def calculate_stats(records):
     return {
         "present": present,
         "absent": absent,
+        "no_class": no_class,
         "total": total,
         "percentage": percentage,
     }
+
+
+def status_counts(prefix=""):
+    """
+    Conditional Count() expressions for every status.
+    prefix lets the same expressions run from Subject through the reverse
+    relation, e.g. status_counts("attendance_records__").
+    """
+    return {
+        "present": Count(f"{prefix}id", filter=Q(**{f"{prefix}status": Attendance.Status.PRESENT})),
+        "absent": Count(f"{prefix}id", filter=Q(**{f"{prefix}status": Attendance.Status.ABSENT})),
+        "no_class": Count(f"{prefix}id", filter=Q(**{f"{prefix}status": Attendance.Status.NO_CLASS})),
+    }
+
+
+COUNTER_VALUES = (
+    "attendance_counter__present",
+    "attendance_counter__absent",
+    "attendance_counter__no_class",
+)
+
+
+def counter_stats(row):
+    # row: a Subject .values() dict holding the COUNTER_VALUES columns
+    return build_stats(*(row[name] for name in COUNTER_VALUES))
+
+
+def fill_missing_counters(rows):
+    """
+    rows: Subject .values() dicts with "id" and the COUNTER_VALUES columns.
+    Subjects created before the counters existed (or never marked) have no
+    counter row yet; those are built once from the raw records and their
+    columns filled in.
+    """
+    from .counters import rebuild_counters
+
+    missing = [row["id"] for row in rows if row[COUNTER_VALUES[0]] is None]
+    if not missing:
+        return rows
+
+    rebuild_counters(missing)
+    # the replica may not have the new counters yet
+    with use_primary():
+        refreshed = {
+            row["id"]: row
+            for row in Subject.objects.filter(id__in=missing).values("id", *COUNTER_VALUES)
+        }
+    return [
+        {**row, **refreshed[row["id"]]} if row["id"] in refreshed else row
+        for row in rows
+    ]
+
+
+def calculate_subject_stats(user, subject_id):
+    """
+    Stats for one subject, read from its materialized counter.
+    The ownership check and the read share one query; returns None when
+    the subject does not belong to the user.
+    """
+    row = (
+        Subject.objects.filter(id=subject_id, owner=user)
+        .values("id", *COUNTER_VALUES)
+        .first()
+    )
+    if row is None:
+        return None
+    return counter_stats(fill_missing_counters([row])[0])
+
+
+def calculate_overall_stats(user):
+    """
+    Overall stats for the dashboard plus a per subject breakdown.
+    Reads every subject's counter in one query, so the cost depends on
+    neither the number of subjects nor the length of the semester.
+    """
+    rows = fill_missing_counters(list(
+        Subject.objects.filter(owner=user).values("id", "subject_name", *COUNTER_VALUES)
+    ))
+    return _overall_stats(rows)
+
+
+def _overall_stats(rows):
+    subjects = []
+    present = absent = no_class = 0
+    for row in rows:
+        stats = counter_stats(row)
+        present += stats["present"]
+        absent += stats["absent"]
+        no_class += stats["no_class"]
+        subjects.append({
+            "subject": row["id"],
+            "subject_name": row["subject_name"],
+            **stats,
+        })
+
+    return {
+        **build_stats(present, absent, no_class),
+        "subjects": subjects,
+    }
+
+
+def count_weekday(start, end, weekday):
+    """
+    How many dates in [start, end] fall on weekday (0 = Monday), in O(1).
+    """
+    if end < start:
+        return 0
+    full_weeks, extra_days = divmod((end - start).days + 1, 7)
+    return full_weeks + (1 if (weekday - start.weekday()) % 7 < extra_days else 0)
+
+
+def project_attendance(present, absent, upcoming, target):
+    """
+    Forward looking numbers for one subject. target is a Fraction (0.75).
+
+    can_skip     classes out of the upcoming ones that can still be missed
+                 while finishing at or above target (None if even perfect
+                 attendance cannot reach it)
+    must_attend  classes in a row needed to get back to target from here
+                 (0 when already there, None when target is 100% and a class
+                 was already missed)
+    reachable    whether must_attend fits into the upcoming classes
+    """
+    final_total = present + absent + upcoming
+    best = Fraction(present + upcoming, final_total) if final_total else Fraction(0)
+
+    # (present + upcoming - k) / final_total >= target
+    skip = math.floor(present + upcoming - target * final_total) if final_total else 0
+    can_skip = min(skip, upcoming) if skip >= 0 else None
+
+    total = present + absent
+    if total == 0 or Fraction(present, total) >= target:
+        must_attend = 0
+    elif target >= 1:
+        must_attend = None
+    else:
+        # (present + x) / (total + x) >= target
+        must_attend = math.ceil((target * total - present) / (1 - target))
+
+    return {
+        "upcoming_classes": upcoming,
+        "can_skip": can_skip,
+        "must_attend": must_attend,
+        "reachable": must_attend is not None and must_attend <= upcoming,
+        "best_case_percentage": round(float(best) * 100, 2),
+    }
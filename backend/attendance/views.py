@@ -1,16 +1,53 @@
+import calendar
+import csv
+import datetime
+import io
+import json
+import logging
+import time
+from collections import defaultdict
+from fractions import Fraction
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
-from .utils import calculate_stats
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.exceptions import ValidationError
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from .analytics import build_analytics
+from .bulk import upsert_attendance
+from .cohort import COHORT_COLUMNS, cohort_rows
+from .dashboard import build_dashboard
+from .feed import build_feed
+from .cache import cache_counters, get_or_compute, invalidate_stats, overall_key, subject_key
+from .counters import apply_status_change, apply_status_changes
+from .importer import ATTENDANCE, REQUIRED_COLUMNS, CsvImporter
+from .utils import (
+    calculate_subject_stats,
+    calculate_overall_stats,
+    count_weekday,
+    encode_month,
+    filter_date_range,
+    parse_date_param,
+    parse_date_value,
+    project_attendance,
+)
 
 
-from .serializers import AttendanceSerializer
+from .serializers import AttendanceSerializer, AttendanceMarkSerializer, SyncChangeSerializer
+from .sync import apply_changes, changes_since, decode_token, next_token, record_deletions
 from .models import Attendance
-from subjects.models import Subject
+from subjects.ownership import check_subject_owner, owned_subject_ids, owns_subject
+from backend.conditional import conditional_get
+from backend.db_routing import ReplicaRoutingMixin
+from timetable.schedule import WEEK, get_week, local_now, user_timezone
+
+logger = logging.getLogger("attendance.cohort")
 
 #this is to mark attendance for a subject on a specific date in calender
-class MarkAttendanceView(APIView):
+class MarkAttendanceView(ReplicaRoutingMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
@@ -23,17 +60,32 @@ class MarkAttendanceView(APIView):
                 {"detail": "subject, date and status are required"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        #same checks as a bulk mark, so an unknown status is a 400 and never stored
+        mark = AttendanceMarkSerializer(data={"subject": subject_id, "date": date, "status": status_value})
+        mark.is_valid(raise_exception=True)
+        date = mark.validated_data["date"]
+        status_value = mark.validated_data["status"]
 
-        subject = Subject.objects.get(
-            id=subject_id,
-            owner=request.user #here changed user to owner as i have the field name as owner
-        )
-        #this lets me to create or update attendance record on that date for that subject
-        attendance, _ = Attendance.objects.update_or_create(
-            subject=subject,
-            date=date,
-            defaults={"status": status_value},
-        )
+        #ownership is checked against the database: the cached set of subject ids
+        #may still list a subject another worker deleted
+        subject_id = check_subject_owner(request.user, mark.validated_data["subject"], for_write=True)
+        with transaction.atomic():
+            #the row is locked whether it was found or just inserted; when two first
+            #marks race, the loser's insert fails and it reads the winner's row,
+            #so the counters only ever count one create
+            attendance, created = Attendance.objects.select_for_update().get_or_create(
+                subject_id=subject_id,
+                date=date,
+                defaults={"status": status_value},
+            )
+            old_status = None if created else attendance.status
+            if old_status != status_value:
+                if not created:
+                    attendance.status = status_value
+                    attendance.changed_at = timezone.now()
+                    attendance.save(update_fields=["status", "changed_at", "updated_at"])
+                apply_status_change(subject_id, old_status, status_value)
+                invalidate_stats(request.user.id, [subject_id], dates=[date])
 
         serializer = AttendanceSerializer(attendance)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -47,61 +99,549 @@ class MarkAttendanceView(APIView):
                 {"detail": "subject and date are required"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        date = parse_date_value(date)
 
-        Attendance.objects.filter(
-            subject__id=subject_id,
-            subject__owner=request.user,
-            date=date,
-        ).delete()
+        with transaction.atomic():
+            records = Attendance.objects.select_for_update(of=("self",)).filter(
+                subject__id=subject_id,
+                subject__owner=request.user,
+                date=date,
+            )
+            removed = list(records.values_list("subject_id", "status"))
+            records.delete()
+            #offline devices learn about the removal through sync/
+            record_deletions([(removed_subject, date) for removed_subject, _ in removed])
+            apply_status_changes(
+                (removed_subject, old_status, None) for removed_subject, old_status in removed
+            )
+            invalidate_stats(
+                request.user.id, {removed_subject for removed_subject, _ in removed}, dates=[date]
+            )
 
         return Response(status=status.HTTP_204_NO_CONTENT)
     
+#this is to mark many days at once (back filling a week, syncing offline edits)
+class BulkMarkAttendanceView(ReplicaRoutingMixin, APIView):
+    """
+    POST {"marks": [{"subject": 1, "date": "2026-01-05", "status": "PRESENT"}, ...]}
+
+    At most MAX_BATCH_SIZE marks per request. Ownership of every subject is
+    checked with one id__in query and all valid marks are written with one
+    bulk upsert. Every item gets a result in the same order it was sent:
+    created, updated, unchanged, duplicate (a later item in the batch has
+    the same subject and date and wins) or error (with the reasons).
+    """
+    permission_classes = [IsAuthenticated]
+    MAX_BATCH_SIZE = 200
+
+    def post(self, request):
+        marks = request.data.get("marks")
+
+        if not isinstance(marks, list) or not marks:
+            return Response(
+                {"detail": "Please provide a non-empty list of marks."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(marks) > self.MAX_BATCH_SIZE:
+            return Response(
+                {"detail": f"At most {self.MAX_BATCH_SIZE} marks per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = [None] * len(marks)
+        valid = {}
+        for index, item in enumerate(marks):
+            serializer = AttendanceMarkSerializer(data=item)
+            if not serializer.is_valid():
+                results[index] = {"index": index, "result": "error", "errors": serializer.errors}
+                continue
+            data = serializer.validated_data
+            valid[index] = (data["subject"], data["date"], data["status"])
+
+        owned = owned_subject_ids(request.user.id, for_write=True)
+
+        #the last mark for a (subject, date) wins, like calling mark/ in order
+        latest = {}
+        for index, (subject_id, day, status_value) in valid.items():
+            if subject_id not in owned:
+                results[index] = {
+                    "index": index,
+                    "result": "error",
+                    "errors": {"subject": ["Subject not found."]},
+                }
+                continue
+            latest[(subject_id, day)] = index
+
+        written = upsert_attendance([valid[index] for index in latest.values()])
+        invalidate_stats(
+            request.user.id,
+            {subject_id for subject_id, _ in latest},
+            dates={day for _, day in latest},
+        )
+
+        for index, (subject_id, day, status_value) in valid.items():
+            if results[index] is not None:
+                continue
+            key = (subject_id, day)
+            results[index] = {
+                "index": index,
+                "subject": subject_id,
+                "date": day.isoformat(),
+                "status": status_value,
+                "result": written[key] if latest[key] == index else "duplicate",
+            }
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+#offline sync: replay queued changes and get everything changed since the last sync
+class SyncAttendanceView(ReplicaRoutingMixin, APIView):
+    """
+    POST {"token": "<from the last sync, optional>",
+          "changes": [{"key": "<idempotency key>", "subject": 1, "date": "2026-01-05",
+                       "status": "PRESENT" | null, "client_time": "2026-01-05T09:10:00Z"}, ...]}
+
+    Changes are applied in order unless the server copy of that subject and
+    date was edited after client_time (result conflict, with the server
+    state). Edits are compared by when the user made them, not when they
+    reached the server.
+    A key that was synced before returns its stored result (replayed) and
+    writes nothing, so a batch can be retried safely.
+
+    The response carries a result per change, the marks written and removed
+    since token ("changes"; every mark without a token) and the next token.
+    """
+    permission_classes = [IsAuthenticated]
+    MAX_BATCH_SIZE = 500
+
+    def post(self, request):
+        changes = request.data.get("changes", [])
+        if not isinstance(changes, list):
+            raise ValidationError({"changes": ["Must be a list."]})
+        if len(changes) > self.MAX_BATCH_SIZE:
+            raise ValidationError({"changes": [f"At most {self.MAX_BATCH_SIZE} changes per request."]})
+        try:
+            since = decode_token(request.data.get("token"))
+        except (TypeError, ValueError, OverflowError):
+            raise ValidationError({"token": ["Invalid sync token."]})
+
+        owned = owned_subject_ids(request.user.id, for_write=True)
+        results = [None] * len(changes)
+        valid = []
+        for index, item in enumerate(changes):
+            serializer = SyncChangeSerializer(data=item)
+            if not serializer.is_valid():
+                results[index] = {"index": index, "result": "error", "errors": serializer.errors}
+            elif serializer.validated_data["subject"] not in owned:
+                results[index] = {"index": index, "result": "error", "errors": {"subject": ["Subject not found."]}}
+            else:
+                valid.append((index, serializer.validated_data))
+
+        outcome = apply_changes(request.user, [data for _, data in valid])
+        seen = set()
+        for index, data in valid:
+            key = data["key"]
+            #a key sent twice in one batch only counts the first time
+            results[index] = {"index": index, **outcome[key]} if key not in seen else {
+                "index": index, "key": key, "result": "duplicate",
+            }
+            seen.add(key)
+
+        started = timezone.now()
+        return Response(
+            {
+                "results": results,
+                "changes": changes_since(request.user, since),
+                "token": next_token(started),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 #this is to get attendance records for a specific subject
 #in frontend think like click a subject -> see full attendance history
 #The calendar (needs all attendance records → list) view for that subject
 #this is for the info calendar to show which days were present/absent/no class
-class SubjectAttendanceListView(APIView):
+class SubjectAttendanceListView(ReplicaRoutingMixin, APIView):
+    """
+    GET ?from=YYYY-MM-DD&to=YYYY-MM-DD&limit=N&cursor=YYYY-MM-DD
+
+    from/to limit the records to the visible calendar window. limit turns on
+    keyset pagination over the -date ordering: when more rows exist the
+    response carries a Link rel="next" header (and X-Next-Cursor) pointing
+    at the rows older than the last date returned. The body stays a plain
+    list so existing clients keep working.
+    """
     permission_classes = [IsAuthenticated]
+    MAX_PAGE_SIZE = 366
 
     def get(self, request, subject_id):
-        subject = Subject.objects.get(
-            id=subject_id,
-            owner=request.user
+        check_subject_owner(request.user, subject_id)
+
+        records = filter_date_range(Attendance.objects.filter(subject_id=subject_id), request)
+
+        #dates are unique per subject, so the last date seen is a complete cursor
+        cursor = parse_date_param(request, "cursor")
+        if cursor:
+            records = records.filter(date__lt=cursor)
+
+        limit = self.get_limit(request)
+        return conditional_get(
+            request, records, lambda: self.build_response(request, records, limit)
         )
 
-        records = Attendance.objects.filter(subject=subject)
+    def build_response(self, request, records, limit):
+        next_cursor = None
+        if limit:
+            #fetch one extra row to know if there is a next page without a count()
+            page = list(records.order_by("-date")[:limit + 1])
+            if len(page) > limit:
+                page = page[:limit]
+                next_cursor = page[-1].date.isoformat()
+            records = page
+
         #here we pack the records into serializer to convert to json and 
         #send to frontend by response
         serializer = AttendanceSerializer(records, many=True)
+        response = Response(serializer.data, status=status.HTTP_200_OK)
+
+        if next_cursor:
+            params = request.query_params.copy()
+            params["cursor"] = next_cursor
+            next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+            response["Link"] = f'<{next_url}>; rel="next"'
+            response["X-Next-Cursor"] = next_cursor
+
+        return response
+
+    def get_limit(self, request):
+        limit = request.query_params.get("limit")
+        if limit is None:
+            return None
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValidationError({"limit": ["Must be a number."]})
+        if limit < 1:
+            raise ValidationError({"limit": ["Must be at least 1."]})
+        return min(limit, self.MAX_PAGE_SIZE)
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
-    
+
+
+#compact calendar feed: one month of date -> status as a single string
+#GET subject/<id>/month/2026/1/ -> {"days": "PPA-N-..."}
+#P present, A absent, N no class, - not marked; index 0 is the 1st
+class SubjectAttendanceMonthView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, subject_id, year, month):
+        if not 1 <= month <= 12 or not 1 <= year <= 9999:
+            return Response(
+                {"detail": "Invalid month"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not owns_subject(request.user, subject_id):
+            return Response(
+                {"detail": "Subject not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        days_in_month = calendar.monthrange(year, month)[1]
+        #no model instances and no serializer, just the two columns we need
+        rows = Attendance.objects.filter(
+            subject_id=subject_id,
+            date__range=(
+                datetime.date(year, month, 1),
+                datetime.date(year, month, days_in_month),
+            ),
+        ).order_by().values_list("date", "status")
+
+        return Response(
+            {
+                "subject": subject_id,
+                "year": year,
+                "month": month,
+                "days": encode_month(rows, days_in_month),
+            },
+            status=status.HTTP_200_OK,
+        )
 
 
 #Stats (present, absent, percentage → summary) for a specific subject
 #this is for the summary view for a subject
 
-class SubjectAttendanceStatsView(APIView):
+class SubjectAttendanceStatsView(ReplicaRoutingMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, subject_id):
-        subject = Subject.objects.get(
-            id=subject_id,
-            owner=request.user
+        stats = get_or_compute(
+            subject_key(request.user.id, subject_id),
+            lambda: calculate_subject_stats(request.user, subject_id),
         )
+        if stats is None:
+            return Response(
+                {"detail": "Subject not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
 
-        records = Attendance.objects.filter(subject=subject)
-        stats = calculate_stats(records)
+        return Response(stats, status=status.HTTP_200_OK)
 
+class OverallAttendanceStatsView(ReplicaRoutingMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    #totals and per subject breakdown, read from the counters (and cached)
+    def get(self, request):
+        stats = get_or_compute(
+            overall_key(request.user.id),
+            lambda: calculate_overall_stats(request.user),
+        )
         return Response(stats, status=status.HTTP_200_OK)
 
-class OverallAttendanceStatsView(APIView):
+
+#everything the home screen needs in one request instead of subjects + today +
+#overall stats + one stats call per subject; a fixed number of queries (see build_dashboard)
+#GET dashboard/[?tz=Asia/Kolkata]
+class DashboardView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        now = local_now(user_timezone(request))
+        return Response(build_dashboard(request.user, now), status=status.HTTP_200_OK)
+
+
+#everything of the user that changed since the last refresh
+#GET /api/v1/changes/[?cursor=<from the last response>]
+#no cursor: every subject, timetable day and mark; keep the returned cursor for next time.
+#not routed to the replica: a lagging replica would make the cursor skip rows
+class ChangeFeedView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            since = decode_token(request.query_params.get("cursor"))
+        except (TypeError, ValueError, OverflowError):
+            raise ValidationError({"cursor": ["Invalid cursor."]})
+
+        started = timezone.now()
+        data = build_feed(request.user, since)
+        return Response({"cursor": next_token(started), **data}, status=status.HTTP_200_OK)
+
+
+#weekly/monthly trends, weekday absence pattern and present streaks
+#GET analytics/[?from=YYYY-MM-DD][&to=YYYY-MM-DD][&subject=<id>]
+#past weeks/months are cached, only the current week/month is aggregated per request
+class AttendanceAnalyticsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        start = parse_date_param(request, "from")
+        end = parse_date_param(request, "to")
+        if start and end and start > end:
+            raise ValidationError({"to": ["Must not be before from."]})
+
+        subject_id = request.query_params.get("subject")
+        if subject_id:
+            if not subject_id.isdigit():
+                raise ValidationError({"subject": ["Must be a subject id."]})
+            subject_id = check_subject_owner(request.user, subject_id)
+
+        data = build_analytics(request.user, start, end, subject_id or None)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+#"how many classes can i skip" for every subject in one request
+#GET projection/?until=2026-05-31&target=75[&from=2026-02-01][&tz=Asia/Kolkata]
+#upcoming classes are counted per weekday arithmetically from the cached weekly
+#schedule, so the cost is constant per subject whatever the semester length
+class AttendanceProjectionView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        records = Attendance.objects.filter(
-            subject__owner=request.user #changed to owner from user
+        until = parse_date_param(request, "until")
+        if until is None:
+            raise ValidationError({"until": ["The semester end date is required."]})
+
+        #classes from tomorrow on, today is usually marked already
+        tz = user_timezone(request)
+        start = parse_date_param(request, "from") or local_now(tz).date() + datetime.timedelta(days=1)
+
+        try:
+            target = Fraction(request.query_params.get("target", "75")) / 100
+        except (ValueError, ZeroDivisionError):
+            raise ValidationError({"target": ["Must be a number."]})
+        if not 0 < target <= 1:
+            raise ValidationError({"target": ["Must be between 0 and 100."]})
+
+        stats = get_or_compute(
+            overall_key(request.user.id),
+            lambda: calculate_overall_stats(request.user),
         )
 
-        stats = calculate_stats(records)
-        return Response(stats, status=status.HTTP_200_OK)
+        week = get_week(request.user.id)["days"]
+        weekdays = defaultdict(list)
+        for index, day in enumerate(WEEK):
+            for slot in week[day]:
+                weekdays[slot["subject"]].append(index)
+
+        subjects = []
+        for row in stats["subjects"]:
+            upcoming = sum(count_weekday(start, until, day) for day in weekdays[row["subject"]])
+            subjects.append({
+                "subject": row["subject"],
+                "subject_name": row["subject_name"],
+                "present": row["present"],
+                "absent": row["absent"],
+                "percentage": row["percentage"],
+                **project_attendance(row["present"], row["absent"], upcoming, target),
+            })
+
+        return Response(
+            {
+                "from": start.isoformat(),
+                "until": until.isoformat(),
+                "target": float(target * 100),
+                "subjects": subjects,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class _Echo:
+    #csv.writer wants a file; this one hands the line straight back
+    def write(self, value):
+        return value
+
+
+#download the attendance history as CSV or NDJSON
+#GET export/?type=csv|ndjson&subject=<id>&from=YYYY-MM-DD&to=YYYY-MM-DD&status=PRESENT
+#rows are streamed from a database cursor, so memory stays flat however long the history is
+class AttendanceExportView(APIView):
+    permission_classes = [IsAuthenticated]
+    CHUNK_SIZE = 2000
+    COLUMNS = ["subject", "subject_name", "subject_code", "date", "status", "updated_at"]
+
+    def get(self, request):
+        export_type = request.query_params.get("type", "csv")
+        if export_type not in ("csv", "ndjson"):
+            raise ValidationError({"type": ["Use csv or ndjson."]})
+
+        records = filter_date_range(
+            Attendance.objects.filter(subject__owner=request.user), request
+        )
+
+        subject_id = request.query_params.get("subject")
+        if subject_id:
+            if not subject_id.isdigit():
+                raise ValidationError({"subject": ["Must be a subject id."]})
+            records = records.filter(subject_id=subject_id)
+
+        status_value = request.query_params.get("status")
+        if status_value:
+            if status_value not in Attendance.Status.values:
+                raise ValidationError({"status": [f"Use one of {', '.join(Attendance.Status.values)}."]})
+            records = records.filter(status=status_value)
+
+        rows = records.order_by("subject_id", "date").values_list(
+            "subject_id",
+            "subject__subject_name",
+            "subject__subject_code",
+            "date",
+            "status",
+            "updated_at",
+        ).iterator(chunk_size=self.CHUNK_SIZE)
+
+        if export_type == "csv":
+            content, content_type = self.csv_lines(rows), "text/csv"
+        else:
+            content, content_type = self.ndjson_lines(rows), "application/x-ndjson"
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="attendance.{export_type}"'
+        return response
+
+    def csv_lines(self, rows):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(self.COLUMNS)
+        for row in rows:
+            yield writer.writerow(
+                [*row[:3], row[3].isoformat(), row[4], row[5].isoformat()]
+            )
+
+    def ndjson_lines(self, rows):
+        for row in rows:
+            yield json.dumps(
+                dict(zip(self.COLUMNS, [*row[:3], row[3].isoformat(), row[4], row[5].isoformat()]))
+            ) + "\n"
+
+
+#every (student, subject) under the threshold, across all users (admin only)
+#GET cohort-report/[?threshold=75][&from=YYYY-MM-DD][&to=YYYY-MM-DD][&min_classes=1]
+#streamed as CSV; the same report is available as manage.py cohort_report
+class CohortReportView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        try:
+            threshold = float(request.query_params.get("threshold", 75))
+        except ValueError:
+            threshold = None
+        if threshold is None or not 0 < threshold <= 100:
+            raise ValidationError({"threshold": ["Must be a number in (0, 100]."]})
+        min_classes = request.query_params.get("min_classes", "1")
+        if not min_classes.isdigit():
+            raise ValidationError({"min_classes": ["Must be a whole number."]})
+
+        rows = cohort_rows(
+            threshold=threshold,
+            start=parse_date_param(request, "from"),
+            end=parse_date_param(request, "to"),
+            min_classes=int(min_classes),
+        )
+        response = StreamingHttpResponse(self.csv_lines(rows), content_type="text/csv")
+        response["Content-Disposition"] = 'attachment; filename="cohort-report.csv"'
+        return response
+
+    def csv_lines(self, rows):
+        writer = csv.writer(_Echo())
+        started = time.monotonic()
+        count = 0
+        yield writer.writerow(COHORT_COLUMNS)
+        for row in rows:
+            count += 1
+            yield writer.writerow(row)
+        logger.info("cohort report: %d rows in %.2fs", count, time.monotonic() - started)
+
+
+#import attendance or timetable rows from a spreadsheet export
+#POST multipart: file=<csv>, kind=attendance|timetable (default attendance)
+#attendance columns: subject_name,date,status  timetable: subject_name,day_of_week[,start_time,end_time]
+#unknown subject names are created; bad rows are skipped and listed in "errors" with their line
+class ImportCsvView(ReplicaRoutingMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": ["Upload a CSV file."]})
+        kind = request.data.get("kind", ATTENDANCE)
+        if kind not in REQUIRED_COLUMNS:
+            raise ValidationError({"kind": [f"Use one of {', '.join(REQUIRED_COLUMNS)}."]})
+
+        #decode while reading, the upload is never loaded into memory as a whole
+        lines = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            report = CsvImporter(request.user, kind).run(lines)
+        except UnicodeDecodeError:
+            raise ValidationError({"file": ["The file must be UTF-8 encoded CSV."]})
+
+        if report["rows"] == 0 and report["errors"]:
+            return Response(report, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_200_OK)
+
+
+#hit/miss counters of the stats cache, admins only
+class StatsCacheView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_counters(), status=status.HTTP_200_OK)
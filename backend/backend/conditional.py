@@ -0,0 +1,70 @@
+import hashlib
+from datetime import datetime
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def collection_version(queryset, related=()):
+    """
+    Cheap version of a list endpoint: (Max(updated_at), row count) in one
+    aggregate. Edits bump the max, deletes change the count.
+
+    related names relations whose rows are part of the response (e.g. the
+    subjects' counters); their Max(updated_at) and count join the version.
+    """
+    aggregates = {
+        "last_modified": Max("updated_at"),
+        "count": Count("id", distinct=bool(related)),
+    }
+    for name in related:
+        aggregates[f"{name}_modified"] = Max(f"{name}__updated_at")
+        aggregates[f"{name}_count"] = Count(name, distinct=True)
+    return queryset.order_by().aggregate(**aggregates)
+
+
+def conditional_get(request, queryset, build_response, *scope, related=()):
+    """
+    Answer a GET with 304 Not Modified when the client already has the
+    current version of queryset, otherwise call build_response().
+
+    The ETag covers the path, the query string, anything extra passed in
+    scope (e.g. today's weekday) and the collection version (see
+    collection_version for related), so nothing is serialized for a
+    matching If-None-Match.
+
+    No Last-Modified is sent: deleting the newest row moves Max(updated_at)
+    back, so If-Modified-Since would answer 304 for a list that lost a row.
+    Only the ETag, which also covers the row count, sees deletes.
+    """
+    version = [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in collection_version(queryset, related).values()
+    ]
+    return conditional_response(request, build_response, None, *scope, *version)
+
+
+def conditional_response(request, build_response, last_modified, *version):
+    """
+    Same as conditional_get for data whose version is already known (for
+    example a cached payload and its hash), so no query is needed at all.
+    """
+    raw = "|".join(
+        str(part)
+        for part in (request.path, request.META.get("QUERY_STRING", ""), *version)
+    )
+    etag = quote_etag(hashlib.sha256(raw.encode()).hexdigest()[:32])
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = build_response()
+
+    response["ETag"] = etag
+    if timestamp is not None:
+        response["Last-Modified"] = http_date(timestamp)
+    # responses differ per user (JWT), never let a shared cache reuse them
+    response["Cache-Control"] = "private, no-cache"
+    patch_vary_headers(response, ["Authorization"])
+    return response
@@ -0,0 +1,145 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA = "replica"
+
+# cache backends that keep their entries inside one process
+PER_PROCESS_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+# set for the duration of a view that may read from the replica
+_use_replica = ContextVar("use_replica", default=False)
+
+
+@contextmanager
+def use_primary():
+    """
+    Route every query inside to the primary, even in a replica routed view:
+    for reads that feed a write (the replica may lag) or run in a
+    transaction opened on the primary.
+    """
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def replica_configured():
+    return REPLICA in connections.settings
+
+
+def pin_key(user_id):
+    return f"db:pin-primary:{user_id}"
+
+
+def pin_to_primary(user_id):
+    # the default cache, shared by every worker when a replica is configured
+    # (see check_shared_cache); outlasts the replication lag
+    cache.set(pin_key(user_id), True, timeout=settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_id):
+    return cache.get(pin_key(user_id)) is not None
+
+
+SHARED_CACHE_HINT = (
+    "Set CACHE_BACKEND and CACHE_LOCATION to a redis or memcached server "
+    "(or, on one host, django.core.cache.backends.filebased.FileBasedCache and a directory)."
+)
+
+
+def check_shared_cache(app_configs, **kwargs):
+    """
+    The read-your-writes pin lives in the default cache; a per process
+    cache would let the next request, served by another worker, read the
+    user's write back from a lagging replica. Without a replica, several
+    workers on a per process cache serve each other's invalidated entries
+    until CACHE_TTL runs out, which is worth a warning.
+    """
+    if settings.CACHES["default"]["BACKEND"] not in PER_PROCESS_CACHES:
+        return []
+    if replica_configured():
+        return [
+            checks.Error(
+                "A read replica needs a cache shared by all workers.",
+                hint=SHARED_CACHE_HINT,
+                id="backend.E001",
+            )
+        ]
+    if settings.WEB_CONCURRENCY > 1:
+        return [
+            checks.Warning(
+                f"{settings.WEB_CONCURRENCY} workers share no cache: a worker keeps serving "
+                f"stats and schedules another worker's write changed for up to {settings.CACHE_TTL}s.",
+                hint=SHARED_CACHE_HINT,
+                id="backend.W001",
+            )
+        ]
+    return []
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends reads to the replica only while a ReplicaRoutingMixin view has
+    chosen it for the current request; all other reads and every write go
+    to the primary (default).
+    """
+
+    def db_for_read(self, model, **hints):
+        return REPLICA if _use_replica.get() else None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica holds the same rows, objects from both can be mixed
+        return True
+
+
+class ReplicaRoutingMixin:
+    """
+    For DRF views. Safe requests read from the replica unless the user wrote
+    in the last REPLICA_PIN_SECONDS; replica_actions limits that to some
+    viewset actions. Successful writes pin the user to the primary so they
+    always read their own writes. Does nothing without a replica.
+    """
+
+    replica_actions = None
+
+    def dispatch(self, request, *args, **kwargs):
+        # reset in finally: exceptions DRF does not handle skip finalize_response
+        self._replica_token = None
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            if self._replica_token is not None:
+                _use_replica.reset(self._replica_token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            replica_configured()
+            and request.method in SAFE_METHODS
+            and (self.replica_actions is None or getattr(self, "action", None) in self.replica_actions)
+            and not is_pinned(request.user.id)
+        ):
+            self._replica_token = _use_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            replica_configured()
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and request.user.is_authenticated
+        ):
+            pin_to_primary(request.user.id)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -1,3 +1,15 @@
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .profiling import QueryRecorder, record_queries, record_slow_request
+
+logger = logging.getLogger("backend.profiling")
+
+
 class DisableCSRFForAPI:
     def __init__(self, get_response):
         self.get_response = get_response
@@ -5,4 +17,98 @@ class DisableCSRFForAPI:
     def __call__(self, request):
         if request.path.startswith('/api/'):
             setattr(request, '_dont_enforce_csrf_checks', True)
-        return self.get_response(request)
\ No newline at end of file
+        return self.get_response(request)
+
+class RequestProfilingMiddleware:
+    """
+    Opt-in (PROFILING_ENABLED) per request profile: total time, SQL time,
+    query count, duplicate queries and serialize time, the time spent
+    turning the response into bytes (the renderer for DRF responses,
+    producing the body for streaming ones). Sent back as a
+    Server-Timing header and logged as one line on the "backend.profiling"
+    logger. Requests slower than PROFILING_SLOW_MS are kept in a ring buffer
+    readable at /api/v1/debug/slow-requests/ (admins only).
+
+    Streaming responses (e.g. the attendance export) send their headers
+    before the body exists, so they get no Server-Timing header; they are
+    logged when the stream ends, with the queries run while streaming.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "PROFILING_SLOW_MS", 500)
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        request._profiling_serialize = 0.0
+        started = time.perf_counter()
+
+        with record_queries(recorder):
+            response = self.get_response(request)
+
+        if response.streaming:
+            response.streaming_content = self.profiled_stream(
+                request, response, iter(response.streaming_content), recorder, started
+            )
+            return response
+
+        profile = self.profile(request, response, recorder, started)
+        response["Server-Timing"] = ", ".join([
+            f"total;dur={profile['total_ms']:.1f}",
+            f"sql;dur={profile['sql_ms']:.1f};desc=\"{recorder.count} queries, {recorder.duplicates} duplicate\"",
+            f"serialize;dur={profile['serialize_ms']:.1f}",
+        ])
+        self.log(request, profile, recorder)
+        return response
+
+    def profiled_stream(self, request, response, chunks, recorder, started):
+        # the body is produced while the server sends it; only the time
+        # spent producing each chunk counts, not the time on the socket
+        try:
+            while True:
+                chunk_started = time.perf_counter()
+                with record_queries(recorder):
+                    try:
+                        chunk = next(chunks)
+                    except StopIteration:
+                        break
+                    finally:
+                        request._profiling_serialize += time.perf_counter() - chunk_started
+                yield chunk
+        finally:
+            self.log(request, self.profile(request, response, recorder, started), recorder)
+
+    def profile(self, request, response, recorder, started):
+        return {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round((time.perf_counter() - started) * 1000, 2),
+            "sql_ms": round(recorder.duration * 1000, 2),
+            "queries": recorder.count,
+            "duplicate_queries": recorder.duplicates,
+            "serialize_ms": round(request._profiling_serialize * 1000, 2),
+        }
+
+    def log(self, request, profile, recorder):
+        logger.info("request_profile %s", json.dumps(profile))
+        if profile["total_ms"] >= self.slow_ms:
+            record_slow_request({
+                **profile,
+                "at": time.time(),
+                "user": getattr(getattr(request, "user", None), "pk", None),
+                "repeated_sql": recorder.most_repeated(),
+            })
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time that step
+        # with a post render callback
+        render_started = time.perf_counter()
+
+        def done(rendered):
+            request._profiling_serialize += time.perf_counter() - render_started
+
+        response.add_post_render_callback(done)
+        return response
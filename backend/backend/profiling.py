@@ -0,0 +1,66 @@
+import random
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+_lock = threading.Lock()
+_slow_requests = deque(maxlen=getattr(settings, "PROFILING_BUFFER_SIZE", 100))
+
+
+class QueryRecorder:
+    """
+    execute_wrapper that times every SQL statement of a request and counts
+    repeats of the same statement (same SQL, any params) to spot N+1 loops.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        return sum(n - 1 for n in self.statements.values() if n > 1)
+
+    def most_repeated(self, limit=3):
+        return [
+            {"sql": sql[:300], "count": n}
+            for sql, n in self.statements.most_common(limit)
+            if n > 1
+        ]
+
+
+@contextmanager
+def record_queries(recorder):
+    # connections are per thread: enter this on the thread running the queries
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield
+
+
+def record_slow_request(entry):
+    rate = getattr(settings, "PROFILING_SLOW_SAMPLE_RATE", 1.0)
+    if rate < 1.0 and random.random() >= rate:
+        return
+    with _lock:
+        _slow_requests.append(entry)
+
+
+def slow_requests():
+    # newest first
+    with _lock:
+        return list(reversed(_slow_requests))
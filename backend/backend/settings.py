@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -9,15 +10,85 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(os.path.join(BASE_DIR, '.env'))
 
 # Database
+# falls back to a local sqlite file so tests and local dev work without postgres;
+# on Render a missing DATABASE_URL is a deploy mistake, not a reason to use sqlite
+DATABASE_URL = os.environ.get("DATABASE_URL")
+if not DATABASE_URL:
+    if os.environ.get("RENDER"):
+        raise ImproperlyConfigured("DATABASE_URL must be set when running on Render.")
+    DATABASE_URL = f"sqlite:///{BASE_DIR / 'db.sqlite3'}"
+
 DATABASES = {
-    "default": dj_database_url.config(
-        default=os.environ.get("DATABASE_URL"),
+    "default": dj_database_url.parse(
+        DATABASE_URL,
         conn_max_age=600,
         conn_health_checks=True,
-        ssl_require=True
+        # sqlite does not understand sslmode
+        ssl_require=not DATABASE_URL.startswith("sqlite"),
     )
 }
 
+# optional read replica; only views using backend.db_routing.ReplicaRoutingMixin read from it
+# (locally two sqlite files work: copy db.sqlite3 to the replica file to "replicate",
+# with CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache as the shared cache);
+# the tests set up their own replica, run them without REPLICA_DATABASE_URL
+REPLICA_DATABASE_URL = os.environ.get("REPLICA_DATABASE_URL")
+if REPLICA_DATABASE_URL:
+    DATABASES["replica"] = dj_database_url.parse(
+        REPLICA_DATABASE_URL,
+        conn_max_age=600,
+        conn_health_checks=True,
+        ssl_require=not REPLICA_DATABASE_URL.startswith("sqlite"),
+    )
+    DATABASE_ROUTERS = ["backend.db_routing.PrimaryReplicaRouter"]
+# seconds a user reads from the primary after a write; keep above the replication lag
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 5))
+
+# covering indexes (Index.include) are postgres only; sqlite just builds them without
+# the extra columns, which is fine for local dev and tests
+if DATABASE_URL.startswith("sqlite"):
+    SILENCED_SYSTEM_CHECKS = ["models.W040"]
+
+# Cache (stats responses, schedules, analytics, replica pins); local memory by
+# default, which each worker keeps for itself. Several workers, and a read
+# replica, need a shared one: e.g. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# and CACHE_LOCATION=redis://host:6379
+SHARED_CACHE = "CACHE_BACKEND" in os.environ
+# gunicorn's worker count (its default is WEB_CONCURRENCY); several workers on
+# a per process cache get a warning from manage.py check (backend.W001)
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", 1))
+# authenticated users and their owned subject ids; always per process (locmem
+# is an LRU bounded by MAX_ENTRIES), so other workers see changes within the TTL
+AUTH_CACHE_TTL = int(os.environ.get("AUTH_CACHE_TTL", 60))
+AUTH_CACHE_SIZE = int(os.environ.get("AUTH_CACHE_SIZE", 10000))
+# stats, schedules, analytics and pins are all per user; Django's locmem
+# default of 300 entries would evict constantly past a few dozen users
+CACHE_SIZE = int(os.environ.get("CACHE_SIZE", 20000))
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "attendance-tracker"),
+    },
+    "auth": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "attendance-tracker-auth",
+        "TIMEOUT": AUTH_CACHE_TTL,
+        "OPTIONS": {"MAX_ENTRIES": AUTH_CACHE_SIZE},
+    },
+}
+if CACHES["default"]["BACKEND"].endswith(("LocMemCache", "FileBasedCache")):
+    # redis and memcached pass OPTIONS to their client, which rejects MAX_ENTRIES
+    CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": CACHE_SIZE}
+# lifetime of the cached stats, weekly schedules and closed analytics periods.
+# Every write invalidates what it changes, so in a shared cache they can live
+# a day; a per process cache only hears about its own worker's writes, so
+# there they expire within a minute
+CACHE_TTL = int(os.environ.get("CACHE_TTL", 86400 if SHARED_CACHE else 60))
+# offline sync: how long idempotency keys are remembered, and how far a sync
+# token is rewound so rows committed late by concurrent requests are not missed
+SYNC_RECEIPT_DAYS = int(os.environ.get("SYNC_RECEIPT_DAYS", 30))
+SYNC_TOKEN_OVERLAP = int(os.environ.get("SYNC_TOKEN_OVERLAP", 5))
+
 # Security & Debug
 SECRET_KEY = os.environ.get("SECRET_KEY", "django-insecure-local-dev-key-only")
 DEBUG = True
@@ -54,6 +125,7 @@ INSTALLED_APPS = [
 # ------------------ MIDDLEWARE ------------------
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",  # MUST be first
+    "backend.middleware.RequestProfilingMiddleware",  # no-op unless PROFILING_ENABLED
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -65,6 +137,14 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# ------------------ PROFILING ------------------
+# Server-Timing headers + "backend.profiling" log lines for every request
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "False") == "True"
+# requests at least this slow are sampled into the /api/v1/debug/slow-requests/ buffer
+PROFILING_SLOW_MS = int(os.environ.get("PROFILING_SLOW_MS", 500))
+PROFILING_SLOW_SAMPLE_RATE = float(os.environ.get("PROFILING_SLOW_SAMPLE_RATE", 1.0))
+PROFILING_BUFFER_SIZE = int(os.environ.get("PROFILING_BUFFER_SIZE", 100))
+
 # ------------------ CORS CONFIG ------------------
 CORS_ALLOWED_ORIGINS = [
     "https://attendancetracker-bay.vercel.app",
@@ -90,7 +170,7 @@ CSRF_TRUSTED_ORIGINS = [
 # ------------------ REST FRAMEWORK ------------------
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -160,5 +240,10 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'backend.profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
\ No newline at end of file
@@ -0,0 +1,214 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core import checks
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from attendance.models import SubjectAttendanceCounter
+from subjects.models import Subject
+from . import profiling
+from .db_routing import REPLICA, check_shared_cache, is_pinned
+
+User = get_user_model()
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_SLOW_MS=0)
+class RequestProfilingTests(APITestCase):
+    def setUp(self):
+        profiling._slow_requests.clear()
+        self.user = User.objects.create_user(
+            username="student", password="pass12345", id_card_number="ID001", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        Subject.objects.create(subject_name="DBMS", owner=self.user)
+
+    def test_server_timing_and_slow_buffer(self):
+        with self.assertLogs("backend.profiling", "INFO") as logs:
+            response = self.client.get(reverse("subject-list"))
+
+        timing = response["Server-Timing"]
+        self.assertIn("total;dur=", timing)
+        self.assertIn("sql;dur=", timing)
+        self.assertIn("serialize;dur=", timing)
+        self.assertIn('"queries":', logs.output[0])
+        self.assertIn('"serialize_ms":', logs.output[0])
+
+        samples = self.client.get(reverse("slow-requests")).json()
+        self.assertEqual(samples[0]["path"], reverse("subject-list"))
+        self.assertGreaterEqual(samples[0]["queries"], 1)
+
+    def test_streamed_responses_are_logged_when_the_stream_ends(self):
+        from attendance.models import Attendance
+
+        Attendance.objects.create(subject=Subject.objects.get(), date="2026-01-05", status="PRESENT")
+        response = self.client.get(reverse("attendance-export"))
+        self.assertNotIn("Server-Timing", response)
+
+        with self.assertLogs("backend.profiling", "INFO") as logs:
+            body = b"".join(response.streaming_content)
+        self.assertIn(b"2026-01-05", body)
+        [line] = logs.output
+        # the export reads its rows while streaming
+        profile = json.loads(line.split("request_profile ", 1)[1])
+        self.assertGreaterEqual(profile["queries"], 1)
+        self.assertGreater(profile["serialize_ms"], 0)
+        self.assertEqual(profiling.slow_requests()[0]["path"], reverse("attendance-export"))
+
+    def test_duplicate_queries_are_counted(self):
+        recorder = profiling.QueryRecorder()
+        execute = lambda sql, params, many, context: None
+        for subject_id in (1, 2, 3):
+            recorder(execute, "SELECT * FROM timetable WHERE subject_id = %s", [subject_id], False, {})
+        recorder(execute, "SELECT 1", [], False, {})
+
+        self.assertEqual(recorder.count, 4)
+        self.assertEqual(recorder.duplicates, 2)
+        self.assertEqual(recorder.most_repeated()[0]["count"], 3)
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_disabled_by_default(self):
+        response = self.client.get(reverse("subject-list"))
+        self.assertNotIn("Server-Timing", response)
+
+
+@override_settings(DATABASE_ROUTERS=["backend.db_routing.PrimaryReplicaRouter"])
+class ReplicaRoutingTests(APITestCase):
+    """
+    The primary is the test database and the replica a second sqlite file
+    holding different names and numbers for the same rows, so every
+    response shows which database it was read from.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # added here, the runner would try to create a test database for it
+        cls.databases = {"default", REPLICA}
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        connections.settings[REPLICA] = {
+            **connections.settings["default"],
+            "NAME": str(Path(cls.replica_dir.name) / "replica.sqlite3"),
+        }
+        call_command("migrate", database=REPLICA, verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        cls.replica_dir.cleanup()
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="student", password="pass12345", id_card_number="ID001"
+        )
+        self.client.force_authenticate(self.user)
+        self.subject = Subject.objects.create(subject_name="DBMS", owner=self.user)
+
+        # bulk_create skips the signals, which would write to the primary
+        User.objects.using(REPLICA).bulk_create([
+            User(id=self.user.id, username="student", id_card_number="ID001")
+        ])
+        Subject.objects.using(REPLICA).bulk_create([
+            Subject(id=self.subject.id, subject_name="DBMS (replica)", owner_id=self.user.id)
+        ])
+        SubjectAttendanceCounter.objects.using(REPLICA).bulk_create([
+            SubjectAttendanceCounter(subject_id=self.subject.id, present=9)
+        ])
+
+    def names(self):
+        return [row["subject_name"] for row in self.client.get(reverse("subject-list")).json()]
+
+    def test_read_views_use_the_replica(self):
+        self.assertEqual(self.names(), ["DBMS (replica)"])
+        stats = self.client.get(reverse("subject-attendance-stats", args=[self.subject.id])).json()
+        self.assertEqual(stats["present"], 9)
+
+        # views that did not opt in keep reading the primary
+        dashboard = self.client.get(reverse("dashboard")).json()
+        self.assertEqual(dashboard["subjects"][0]["subject_name"], "DBMS")
+
+    def test_missing_counter_is_rebuilt_from_the_primary(self):
+        from attendance.models import Attendance
+
+        # the replica lags: no counter and none of the marks yet
+        SubjectAttendanceCounter.objects.using(REPLICA).all().delete()
+        SubjectAttendanceCounter.objects.filter(subject=self.subject).delete()
+        Attendance.objects.create(subject=self.subject, date="2026-01-05", status="PRESENT")
+        Attendance.objects.create(subject=self.subject, date="2026-01-06", status="PRESENT")
+
+        response = self.client.get(reverse("subject-attendance-stats", args=[self.subject.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["present"], 2)
+        self.assertEqual(SubjectAttendanceCounter.objects.get(subject=self.subject).present, 2)
+        self.assertFalse(SubjectAttendanceCounter.objects.using(REPLICA).exists())
+
+        expanded = self.client.get(reverse("subject-list"), {"expand": "stats"}).json()
+        self.assertEqual(expanded[0]["present"], 2)
+
+    def test_writes_pin_the_user_to_the_primary(self):
+        response = self.client.post(
+            reverse("mark-attendance"),
+            {"subject": self.subject.id, "date": "2026-01-05", "status": "PRESENT"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(is_pinned(self.user.id))
+
+        self.assertEqual(self.names(), ["DBMS"])
+        stats = self.client.get(reverse("subject-attendance-stats", args=[self.subject.id])).json()
+        self.assertEqual(stats["present"], 1)
+
+        # once the pin expires reads go back to the replica
+        cache.clear()
+        self.assertEqual(self.names(), ["DBMS (replica)"])
+
+    def test_timetable_write_pins_and_failed_writes_do_not(self):
+        self.client.post(
+            reverse("add-timetable", args=[self.subject.id]),
+            {"subject": self.subject.id, "day_of_week": "XXX"},
+            format="json",
+        )
+        self.assertFalse(is_pinned(self.user.id))
+
+        self.client.post(
+            reverse("add-timetable", args=[self.subject.id]),
+            {"subject": self.subject.id, "day_of_week": "MON", "start_time": "09:00"},
+            format="json",
+        )
+        self.assertTrue(is_pinned(self.user.id))
+        timetable = self.client.get(reverse("subject-timetable", args=[self.subject.id])).json()
+        self.assertEqual(len(timetable), 1)
+
+    def test_replica_requires_a_shared_cache(self):
+        self.assertEqual([error.id for error in check_shared_cache(None)], ["backend.E001"])
+        shared = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_shared_cache(None), [])
+        # all workers of one host share a file cache, enough for local replicas
+        shared = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache"}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_several_workers_without_a_shared_cache_warn(self):
+        with override_settings(WEB_CONCURRENCY=1):
+            self.assertEqual(check_shared_cache(None), [])
+        with override_settings(WEB_CONCURRENCY=4):
+            [warning] = check_shared_cache(None)
+            self.assertEqual(warning.id, "backend.W001")
+            self.assertEqual(warning.level, checks.WARNING)
+
+        shared = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        with override_settings(WEB_CONCURRENCY=4, CACHES=shared):
+            self.assertEqual(check_shared_cache(None), [])
@@ -17,10 +17,16 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from .views import SlowRequestsView
+from attendance.views import ChangeFeedView, DashboardView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/', include('subjects.urls')),
     path('api/v1/attendance/', include('attendance.urls')),
     path('api/v1/timetable/', include('timetable.urls')),
     path('api/v1/accounts/', include('accounts.urls')),
+    path('api/v1/dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('api/v1/changes/', ChangeFeedView.as_view(), name='change-feed'),
+    path('api/v1/debug/slow-requests/', SlowRequestsView.as_view(), name='slow-requests'),
 ]
@@ -0,0 +1,13 @@
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .profiling import slow_requests
+
+
+# slow request samples collected by RequestProfilingMiddleware
+class SlowRequestsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(slow_requests())
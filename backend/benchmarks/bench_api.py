@@ -0,0 +1,383 @@
+"""
+Query-count and latency benchmark for every API route.
+
+Seeds synthetic users, subjects, timetables and several semesters of
+attendance into the test database (SQLite works, no network needed), then
+drives each route through the Django test client with real JWT auth and
+records query count, p50/p95 latency and response size.
+
+The run fails when a route goes over its query budget.
+
+    python manage.py test benchmarks --pattern="bench_*.py"
+
+Scale and output are configured through the environment:
+
+    BENCH_USERS       users to seed              (default 20)
+    BENCH_SUBJECTS    subjects per user          (default 6)
+    BENCH_SEMESTERS   ~120 day semesters of rows (default 2)
+    BENCH_REPEAT      timed calls per route      (default 20)
+    BENCH_OUTPUT      write the results as JSON to this path
+"""
+import json
+import os
+import statistics
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from itertools import count
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from attendance.counters import rebuild_counters
+from attendance.models import Attendance
+from attendance.sync import encode_token
+from subjects.models import Subject
+from timetable.models import Timetable
+
+User = get_user_model()
+
+USERS = int(os.environ.get("BENCH_USERS", 20))
+SUBJECTS = int(os.environ.get("BENCH_SUBJECTS", 6))
+SEMESTERS = int(os.environ.get("BENCH_SEMESTERS", 2))
+REPEAT = int(os.environ.get("BENCH_REPEAT", 20))
+OUTPUT = os.environ.get("BENCH_OUTPUT")
+
+SEMESTER_DAYS = 120
+DAYS = ["MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"]
+
+
+@dataclass
+class Route:
+    name: str
+    method: str
+    # (bench) -> (url, data); called before every timed request
+    prepare: object
+    # highest number of queries a single call may run
+    budget: int
+    auth: bool = True
+    format: str = "json"
+    # the only status code a call may answer with
+    status: int = 200
+
+
+@dataclass
+class Result:
+    name: str
+    status_codes: set = field(default_factory=set)
+    queries: list = field(default_factory=list)
+    latencies: list = field(default_factory=list)
+    sizes: list = field(default_factory=list)
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        if len(latencies) > 1:
+            cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+            p50, p95 = cuts[49], cuts[94]
+        else:
+            p50 = p95 = latencies[0]
+        return {
+            "route": self.name,
+            "status": sorted(self.status_codes),
+            "queries_max": max(self.queries),
+            "p50_ms": round(p50 * 1000, 2),
+            "p95_ms": round(p95 * 1000, 2),
+            "bytes": max(self.sizes),
+        }
+
+
+# the default PBKDF2 hasher would dominate the auth routes; measure our code instead
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ApiBenchmark(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        start = date.today() - timedelta(days=SEMESTER_DAYS * SEMESTERS)
+        statuses = [Attendance.Status.PRESENT] * 3 + [
+            Attendance.Status.ABSENT,
+            Attendance.Status.NO_CLASS,
+        ]
+
+        # the first user is staff so the admin-only routes can be measured too
+        users = [
+            User(username=f"bench{n}", id_card_number=f"BENCH{n}", is_staff=(n == 0))
+            for n in range(USERS)
+        ]
+        for user in users:
+            user.set_password("bench-pass-123")
+        users = User.objects.bulk_create(users)
+
+        subjects = Subject.objects.bulk_create([
+            Subject(subject_name=f"Subject {s}", subject_code=f"S{s}", owner=user)
+            for user in users
+            for s in range(SUBJECTS)
+        ])
+
+        Timetable.objects.bulk_create([
+            Timetable(subject=subject, day_of_week=day)
+            for n, subject in enumerate(subjects)
+            for day in DAYS[n % 3::3]
+        ])
+
+        for subject in subjects:
+            Attendance.objects.bulk_create(
+                [
+                    Attendance(
+                        subject=subject,
+                        date=start + timedelta(days=d),
+                        status=statuses[(d * 7 + subject.id) % len(statuses)],
+                    )
+                    for d in range(SEMESTER_DAYS * SEMESTERS)
+                ],
+                batch_size=500,
+            )
+
+        rebuild_counters()
+        cls.user = users[0]
+        cls.subject = subjects[0]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.access = str(RefreshToken.for_user(self.user).access_token)
+        self.sequence = count()
+
+    # --- helpers used by the route table ------------------------------------
+
+    def next_date(self):
+        return (date(2030, 1, 1) + timedelta(days=next(self.sequence))).isoformat()
+
+    def scratch_subject(self):
+        return Subject.objects.create(
+            subject_name=f"Scratch {next(self.sequence)}", owner=self.user
+        )
+
+    def csv_upload(self, rows):
+        lines = ["subject_name,date,status"] + [
+            f"{self.subject.subject_name},{self.next_date()},PRESENT" for _ in range(rows)
+        ]
+        return SimpleUploadedFile("import.csv", "\n".join(lines).encode(), content_type="text/csv")
+
+    def routes(self):
+        subject_id = self.subject.id
+        today = date.today()
+
+        def marked_day():
+            day = self.next_date()
+            Attendance.objects.create(subject=self.subject, date=day, status="PRESENT")
+            return day
+
+        def new_timetable_day():
+            # a fresh subject every call, so each one adds a day
+            scratch_id = self.scratch_subject().id
+            return (
+                reverse("add-timetable", args=[scratch_id]),
+                {"subject": scratch_id, "day_of_week": "SUN", "start_time": "09:00"},
+            )
+
+        return [
+            # accounts
+            Route("accounts:register", "post", lambda: (reverse("register"), {
+                "username": f"new{next(self.sequence)}",
+                "id_card_number": f"NEW{next(self.sequence)}",
+                "password": "bench-pass-123",
+                "password2": "bench-pass-123",
+            }), budget=4, auth=False, status=201),
+            Route("accounts:token", "post", lambda: (reverse("token_obtain_pair"), {
+                "username": self.user.username, "password": "bench-pass-123",
+            }), budget=4, auth=False),
+            Route("accounts:token-refresh", "post", lambda: (reverse("token_refresh"), {
+                "refresh": str(RefreshToken.for_user(self.user)),
+            }), budget=2, auth=False),
+            Route("accounts:logout", "post", lambda: (reverse("logout"), {
+                "refresh": str(RefreshToken.for_user(self.user)),
+            }), budget=8),
+
+            # subjects
+            Route("subjects:list", "get", lambda: (reverse("subject-list"), None), budget=3),
+            Route("subjects:list-expanded", "get", lambda: (
+                reverse("subject-list") + "?expand=stats,timetable", None
+            ), budget=3),
+            Route("subjects:create", "post", lambda: (reverse("subject-list"), {
+                "subject_name": f"Created {next(self.sequence)}",
+            }), budget=8, status=201),
+            Route("subjects:retrieve", "get", lambda: (
+                reverse("subject-detail", args=[subject_id]), None
+            ), budget=2),
+            Route("subjects:update", "patch", lambda: (
+                reverse("subject-detail", args=[subject_id]), {"subject_code": "UPD"}
+            ), budget=6),
+            Route("subjects:delete", "delete", lambda: (
+                reverse("subject-detail", args=[self.scratch_subject().id]), None
+            ), budget=12, status=204),
+
+            # attendance
+            Route("attendance:mark", "post", lambda: (reverse("mark-attendance"), {
+                "subject": subject_id, "date": self.next_date(), "status": "PRESENT",
+            }), budget=12),
+            Route("attendance:unmark", "delete", lambda: (reverse("mark-attendance"), {
+                "subject": subject_id, "date": marked_day(),
+            }), budget=8, status=204),
+            Route("attendance:bulk-mark", "post", lambda: (reverse("bulk-mark-attendance"), {
+                "marks": [
+                    {"subject": subject_id, "date": self.next_date(), "status": "ABSENT"}
+                    for _ in range(30)
+                ],
+            }), budget=9),
+            # a reconnect: 30 queued marks plus the delta of the last minute
+            Route("attendance:sync", "post", lambda: (reverse("attendance-sync"), {
+                "token": encode_token(timezone.now() - timedelta(minutes=1)),
+                "changes": [
+                    {
+                        "key": uuid.uuid4().hex,
+                        "subject": subject_id,
+                        "date": self.next_date(),
+                        "status": "PRESENT",
+                        "client_time": "2100-01-01T00:00:00Z",
+                    }
+                    for _ in range(30)
+                ],
+            }), budget=13),
+            Route("attendance:records", "get", lambda: (
+                reverse("subject-attendance-records", args=[subject_id]), None
+            ), budget=4),
+            Route("attendance:records-month", "get", lambda: (
+                reverse("subject-attendance-records", args=[subject_id])
+                + f"?from={today.replace(day=1)}&to={today}", None
+            ), budget=4),
+            Route("attendance:month", "get", lambda: (
+                reverse("subject-attendance-month", args=[subject_id, today.year, today.month]),
+                None,
+            ), budget=3),
+            Route("attendance:subject-stats", "get", lambda: (
+                reverse("subject-attendance-stats", args=[subject_id]), None
+            ), budget=2),
+            Route("attendance:overall-stats", "get", lambda: (
+                reverse("overall-attendance-stats"), None
+            ), budget=2),
+            Route("attendance:dashboard", "get", lambda: (reverse("dashboard"), None), budget=3),
+            Route("changes:full", "get", lambda: (reverse("change-feed"), None), budget=3),
+            Route("changes:since", "get", lambda: (
+                reverse("change-feed") + f"?cursor={encode_token(timezone.now())}", None
+            ), budget=6),
+            Route("attendance:projection", "get", lambda: (
+                reverse("attendance-projection") + f"?until={today + timedelta(days=120)}", None
+            ), budget=3),
+            Route("attendance:analytics", "get", lambda: (reverse("attendance-analytics"), None), budget=12),
+            Route("attendance:export-csv", "get", lambda: (
+                reverse("attendance-export"), None
+            ), budget=2),
+            Route("attendance:export-ndjson", "get", lambda: (
+                reverse("attendance-export") + f"?type=ndjson&subject={subject_id}", None
+            ), budget=2),
+            Route("attendance:import", "post", lambda: (reverse("attendance-import"), {
+                "file": self.csv_upload(200),
+            }), budget=11, format="multipart"),
+            Route("attendance:cohort-report", "get", lambda: (reverse("cohort-report"), None), budget=4),
+            Route("attendance:stats-cache", "get", lambda: (
+                reverse("stats-cache"), None
+            ), budget=1),
+
+            # timetable
+            Route("timetable:add", "post", new_timetable_day, budget=8),
+            # SUN is seeded for the first subject: updates its times
+            Route("timetable:update", "post", lambda: (
+                reverse("add-timetable", args=[subject_id]),
+                {"subject": subject_id, "day_of_week": "SUN", "start_time": "09:00"},
+            ), budget=6),
+            Route("timetable:bulk", "post", lambda: (
+                reverse("bulk-add-timetable", args=[subject_id]),
+                {"slots": [
+                    {"day_of_week": "MON", "start_time": "09:00", "end_time": "10:00"},
+                    {"day_of_week": "WED", "start_time": "09:00", "end_time": "10:00"},
+                    {"day_of_week": "FRI", "start_time": "09:00", "end_time": "10:00"},
+                ]},
+            ), budget=8),
+            Route("timetable:subject", "get", lambda: (
+                reverse("subject-timetable", args=[subject_id]), None
+            ), budget=4),
+            Route("timetable:today", "get", lambda: (reverse("today-classes"), None), budget=2),
+            Route("timetable:week", "get", lambda: (reverse("week-schedule"), None), budget=2),
+            Route("timetable:next", "get", lambda: (reverse("next-class"), None), budget=2),
+        ]
+
+    # --- measurement ---------------------------------------------------------
+
+    def measure(self, route):
+        result = Result(route.name)
+        for _ in range(REPEAT):
+            url, data = route.prepare()
+            headers = {}
+            if route.auth:
+                headers["HTTP_AUTHORIZATION"] = f"Bearer {self.access}"
+
+            call = getattr(self.client, route.method)
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = call(url, data, format=route.format, **headers)
+                # streamed bodies run their queries while being consumed
+                if response.streaming:
+                    content = b"".join(response.streaming_content)
+                else:
+                    content = response.content
+                elapsed = time.perf_counter() - started
+
+            result.status_codes.add(response.status_code)
+            result.queries.append(len(queries))
+            result.latencies.append(elapsed)
+            result.sizes.append(len(content))
+        return result
+
+    def test_routes_within_query_budget(self):
+        summaries = []
+        for route in self.routes():
+            result = self.measure(route)
+            summary = result.summary()
+            summary["budget"] = route.budget
+            summaries.append(summary)
+
+            with self.subTest(route.name):
+                self.assertEqual(
+                    result.status_codes, {route.status},
+                    f"{route.name} answered {sorted(result.status_codes)}, expected {route.status}",
+                )
+                self.assertLessEqual(
+                    summary["queries_max"], route.budget,
+                    f"{route.name} ran {summary['queries_max']} queries, budget {route.budget}",
+                )
+
+        self.report(summaries)
+
+    def report(self, summaries):
+        header = f"{'route':30} {'status':>10} {'queries':>8} {'budget':>7} {'p50 ms':>8} {'p95 ms':>8} {'bytes':>8}"
+        print()
+        print(f"users={USERS} subjects/user={SUBJECTS} semesters={SEMESTERS} repeat={REPEAT}")
+        print(header)
+        print("-" * len(header))
+        for row in summaries:
+            codes = ",".join(str(code) for code in row["status"])
+            print(
+                f"{row['route']:30} {codes:>10} {row['queries_max']:>8} {row['budget']:>7} "
+                f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['bytes']:>8}"
+            )
+
+        if OUTPUT:
+            with open(OUTPUT, "w") as fh:
+                json.dump({
+                    "scale": {
+                        "users": USERS,
+                        "subjects": SUBJECTS,
+                        "semesters": SEMESTERS,
+                        "repeat": REPEAT,
+                    },
+                    "routes": summaries,
+                }, fh, indent=2)
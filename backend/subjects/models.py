@@ -14,6 +14,28 @@ class Subject(models.Model):
     class Meta:
         unique_together = ('subject_name', 'owner')
         ordering = ['subject_name']
+        indexes = [
+            # every list is "my subjects ordered by name"; the unique index
+            # above starts with subject_name so it cannot serve the owner filter
+            models.Index(fields=['owner', 'subject_name'], name='subject_owner_name'),
+        ]
 
     def __str__(self):
-        return self.subject_name
\ No newline at end of file
+        return self.subject_name
+
+class SubjectTombstone(models.Model):
+    """
+    A deleted subject, kept so the change feed can tell other devices to
+    drop it (its timetable and attendance go with it).
+    """
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='subject_tombstones')
+    subject_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'deleted_at'], name='subject_tombstone_owner'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject_id} deleted {self.deleted_at}"
@@ -0,0 +1,50 @@
+from django.db import transaction
+from django.http import Http404
+
+from .models import Subject
+from accounts.authentication import auth_cache, subjects_key
+
+
+def owned_subject_ids(user_id, subject_ids=(), for_write=False):
+    """
+    Ids of the user's subjects, from the per process auth cache (one query
+    on a miss). Dropped whenever a subject is created or deleted.
+
+    The cache only hears about creates and deletes handled by this worker,
+    so the set is reloaded from the database when any of subject_ids is
+    missing from it (created elsewhere) and always for writes, where a
+    subject deleted elsewhere would otherwise pass and fail on the FK.
+    """
+    key = subjects_key(user_id)
+    ids = None if for_write else auth_cache.get(key)
+    if ids is None or not ids.issuperset(subject_ids):
+        ids = frozenset(
+            Subject.objects.filter(owner_id=user_id).order_by().values_list("id", flat=True)
+        )
+        auth_cache.set(key, ids)
+    return ids
+
+
+def owns_subject(user, subject_id, for_write=False):
+    try:
+        subject_id = int(subject_id)
+    except (TypeError, ValueError):
+        return False
+    return subject_id in owned_subject_ids(user.id, [subject_id], for_write=for_write)
+
+
+def check_subject_owner(user, subject_id, for_write=False):
+    """
+    Ownership check without loading the subject; 404 like get_object_or_404.
+    Returns the id as an int.
+    """
+    if not owns_subject(user, subject_id, for_write=for_write):
+        raise Http404("Subject not found")
+    return int(subject_id)
+
+
+def invalidate_owned_subjects(user_id):
+    # now for this thread, and again after commit so a request that read the
+    # old set while the transaction was open cannot keep it cached
+    auth_cache.delete(subjects_key(user_id))
+    transaction.on_commit(lambda: auth_cache.delete(subjects_key(user_id)))
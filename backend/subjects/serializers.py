@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from .models import Subject
+from attendance.utils import build_stats
+from timetable.serializers import TimetableSerializer
 
 class SubjectSerializer(serializers.ModelSerializer):
     class Meta:
@@ -8,6 +10,37 @@ class SubjectSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'owner', 'created_at', 'updated_at']
 
 
+STATS_FIELDS = ['present', 'absent', 'no_class', 'total', 'percentage']
 
 
+class SubjectExpandedSerializer(SubjectSerializer):
+    """
+    Read only, flat: the subject fields plus, when asked for in
+    context["expand"], its stats (present/absent/no_class annotated on the
+    queryset) and its timetable (prefetched). Unrequested parts are dropped.
+    """
+    present = serializers.IntegerField(read_only=True)
+    absent = serializers.IntegerField(read_only=True)
+    no_class = serializers.IntegerField(read_only=True)
+    total = serializers.SerializerMethodField()
+    percentage = serializers.SerializerMethodField()
+    timetable = TimetableSerializer(many=True, read_only=True)
 
+    class Meta(SubjectSerializer.Meta):
+        fields = SubjectSerializer.Meta.fields + STATS_FIELDS + ['timetable']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        expand = self.context.get('expand', ())
+        if 'stats' not in expand:
+            for name in STATS_FIELDS:
+                self.fields.pop(name)
+        if 'timetable' not in expand:
+            self.fields.pop('timetable')
+
+    def get_total(self, obj):
+        return obj.present + obj.absent
+
+    def get_percentage(self, obj):
+        # same rounding as the stats endpoints
+        return build_stats(obj.present, obj.absent)['percentage']
@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Subject, SubjectTombstone
+from .ownership import invalidate_owned_subjects
+
+
+@receiver(post_save, sender=Subject)
+def drop_owned_subjects_on_create(sender, instance, created, **kwargs):
+    if created:
+        invalidate_owned_subjects(instance.owner_id)
+
+
+@receiver(post_delete, sender=Subject)
+def drop_owned_subjects_on_delete(sender, instance, **kwargs):
+    invalidate_owned_subjects(instance.owner_id)
+
+
+@receiver(post_delete, sender=Subject)
+def record_subject_tombstone(sender, instance, origin=None, **kwargs):
+    # nobody is left to sync when the owner account itself is deleted
+    if getattr(origin, "model", type(origin)) is get_user_model():
+        return
+    SubjectTombstone.objects.create(
+        owner_id=instance.owner_id, subject_id=instance.id, deleted_at=timezone.now()
+    )
@@ -1,3 +1,109 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from .models import Subject
+
+User = get_user_model()
+
+
+class SubjectListTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="student", password="pass12345", id_card_number="ID001"
+        )
+        self.client.force_authenticate(self.user)
+        self.subject = Subject.objects.create(subject_name="DBMS", owner=self.user)
+        self.url = reverse("subject-list")
+
+    def test_list_supports_conditional_get(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Subject.objects.create(subject_name="OS", owner=self.user)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_expand_stats_and_timetable_in_two_queries(self):
+        from attendance.models import Attendance
+        from attendance.counters import rebuild_counters
+        from timetable.models import Timetable
+
+        for n in range(5):
+            subject = Subject.objects.create(subject_name=f"Subject {n}", owner=self.user)
+            Timetable.objects.create(subject=subject, day_of_week="MON")
+            Timetable.objects.create(subject=subject, day_of_week="WED")
+        Attendance.objects.create(subject=self.subject, date="2026-01-05", status="PRESENT")
+        Attendance.objects.create(subject=self.subject, date="2026-01-06", status="ABSENT")
+        Attendance.objects.create(subject=self.subject, date="2026-01-07", status="ABSENT")
+        rebuild_counters()
+
+        # version, subjects with their counters, timetables
+        with self.assertNumQueries(3):
+            data = self.client.get(self.url, {"expand": "stats,timetable"}).json()
+
+        self.assertEqual(len(data), 6)
+        dbms = data[0]
+        self.assertEqual(
+            {key: dbms[key] for key in ("present", "absent", "no_class", "total", "percentage")},
+            {"present": 1, "absent": 2, "no_class": 0, "total": 3, "percentage": 33.33},
+        )
+        self.assertEqual([slot["day_of_week"] for slot in data[1]["timetable"]], ["MON", "WED"])
+
+        only_stats = self.client.get(self.url, {"expand": "stats"}).json()[0]
+        self.assertNotIn("timetable", only_stats)
+        self.assertNotIn("present", self.client.get(self.url).json()[0])
+
+    def test_expanded_etag_follows_marks(self):
+        from attendance.models import Attendance
+        from attendance.counters import apply_status_change
+
+        from timetable.models import Timetable
+
+        params = {"expand": "stats,timetable"}
+        Attendance.objects.create(subject=self.subject, date="2026-01-05", status="PRESENT")
+        apply_status_change(self.subject.id, None, "PRESENT")
+        etag = self.client.get(self.url, params)["ETag"]
+        # the version query alone, nothing is serialized
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Attendance.objects.filter(subject=self.subject).update(status="ABSENT")
+        apply_status_change(self.subject.id, "PRESENT", "ABSENT")
+        response = self.client.get(self.url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()[0]["present"], response.json()[0]["absent"]), (0, 1))
+
+        etag = response["ETag"]
+        Timetable.objects.create(subject=self.subject, day_of_week="MON")
+        response = self.client.get(self.url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()[0]["timetable"]), 1)
+
+    def test_expanded_stats_count_subjects_without_a_counter(self):
+        from attendance.models import Attendance, SubjectAttendanceCounter
+
+        Attendance.objects.bulk_create([
+            Attendance(subject=self.subject, date="2026-01-05", status="PRESENT"),
+            Attendance(subject=self.subject, date="2026-01-06", status="ABSENT"),
+        ])
+        SubjectAttendanceCounter.objects.filter(subject=self.subject).delete()
+
+        listed = self.client.get(self.url, {"expand": "stats"}).json()[0]
+        self.assertEqual((listed["present"], listed["absent"], listed["total"]), (1, 1, 2))
+        self.assertTrue(SubjectAttendanceCounter.objects.filter(subject=self.subject).exists())
+
+        SubjectAttendanceCounter.objects.filter(subject=self.subject).delete()
+        detail = self.client.get(
+            reverse("subject-detail", args=[self.subject.id]), {"expand": "stats"}
+        ).json()
+        self.assertEqual(detail["percentage"], 50.0)
+
+    def test_expand_rejects_unknown_parts(self):
+        self.assertEqual(self.client.get(self.url, {"expand": "grades"}).status_code, 400)
+        detail = self.client.get(
+            reverse("subject-detail", args=[self.subject.id]), {"expand": "stats"}
+        ).json()
+        self.assertEqual(detail["total"], 0)
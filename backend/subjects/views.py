@@ -1,19 +1,108 @@
+from django.db.models import F
 from rest_framework import viewsets, permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from .models import Subject
-from .serializers import SubjectSerializer
+from .serializers import SubjectExpandedSerializer, SubjectSerializer
+from attendance.counters import COUNTER_FIELDS
+from attendance.utils import fill_missing_counters
+from backend.conditional import conditional_get
+from backend.db_routing import ReplicaRoutingMixin
 
-class SubjectViewSet(viewsets.ModelViewSet):
+EXPANDABLE = ('stats', 'timetable')
+# the related rows each expansion adds to the response, see list()
+EXPAND_RELATIONS = {'stats': 'attendance_counter', 'timetable': 'timetable'}
+
+
+class SubjectViewSet(ReplicaRoutingMixin, viewsets.ModelViewSet):
     """
     Handles list, create, retrieve, update, and delete for Subjects.
     Ensures users only access their own subjects.
+
+    list/retrieve accept ?expand=stats,timetable to inline each subject's
+    attendance numbers and timetable; the list then costs a version query,
+    one query for the subjects (counters joined in) and one for all their
+    timetables, and a 304 only the version query.
     """
     serializer_class = SubjectSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # with a replica configured, list/retrieve read from it (see backend.db_routing)
+    replica_actions = {'list', 'retrieve'}
+
+    def get_expand(self):
+        if self.action not in ('list', 'retrieve'):
+            return set()
+        raw = self.request.query_params.get('expand', '')
+        expand = {part.strip() for part in raw.split(',') if part.strip()}
+        unknown = expand - set(EXPANDABLE)
+        if unknown:
+            raise ValidationError(
+                {'expand': [f"Unknown value(s) {', '.join(sorted(unknown))}; use {', '.join(EXPANDABLE)}."]}
+            )
+        return expand
 
     def get_queryset(self):
         # Return subjects only for the logged-in user
-        print("user ", self.request.user)
-        return Subject.objects.filter(owner=self.request.user)
+        queryset = Subject.objects.filter(owner=self.request.user)
+        expand = self.get_expand()
+        if 'stats' in expand:
+            # None for a subject without a counter row, see fill_stats
+            queryset = queryset.annotate(**{
+                field: F(f'attendance_counter__{field}')
+                for field in COUNTER_FIELDS.values()
+            })
+        if 'timetable' in expand:
+            queryset = queryset.prefetch_related('timetable')
+        return queryset
+
+    def fill_stats(self, subjects):
+        # subjects without a counter row are counted once from their records
+        # instead of showing 0/0
+        rows = fill_missing_counters([
+            {'id': subject.id, **{
+                f'attendance_counter__{field}': getattr(subject, field)
+                for field in COUNTER_FIELDS.values()
+            }}
+            for subject in subjects
+        ])
+        for subject, row in zip(subjects, rows):
+            for field in COUNTER_FIELDS.values():
+                setattr(subject, field, row[f'attendance_counter__{field}'])
+        return subjects
+
+    def get_object(self):
+        subject = super().get_object()
+        if 'stats' in self.get_expand():
+            self.fill_stats([subject])
+        return subject
+
+    def get_serializer_class(self):
+        if self.get_expand():
+            return SubjectExpandedSerializer
+        return SubjectSerializer
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand'] = self.get_expand()
+        return context
+
+    def list(self, request, *args, **kwargs):
+        # the subject list is polled, answer 304 when nothing changed
+        queryset = self.filter_queryset(self.get_queryset())
+        # marks and timetable edits do not touch Subject.updated_at; every
+        # mark bumps the subject's counter row and timetable rows have their
+        # own updated_at, so those join the version of an expanded list
+        return conditional_get(
+            request,
+            queryset,
+            lambda: self.build_list(queryset),
+            related=[EXPAND_RELATIONS[name] for name in sorted(self.get_expand())],
+        )
+
+    def build_list(self, queryset):
+        if 'stats' in self.get_expand():
+            queryset = self.fill_stats(list(queryset))
+        return Response(self.get_serializer(queryset, many=True).data)
 
     def perform_create(self, serializer):
         # Automatically assign the logged-in user as owner
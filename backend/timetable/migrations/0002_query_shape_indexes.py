@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subjects', '0002_query_shape_indexes'),
+        ('timetable', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='timetable',
+            index=models.Index(fields=['day_of_week', 'subject'], name='timetable_day_subject'),
+        ),
+    ]
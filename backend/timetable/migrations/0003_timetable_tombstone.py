@@ -0,0 +1,27 @@
+# Generated by Django 5.2.10 on 2026-10-18 19:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subjects', '0003_subject_tombstone'),
+        ('timetable', '0002_query_shape_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimetableTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day_of_week', models.CharField(choices=[('MON', 'Monday'), ('TUE', 'Tuesday'), ('WED', 'Wednesday'), ('THU', 'Thursday'), ('FRI', 'Friday'), ('SAT', 'Saturday'), ('SUN', 'Sunday')], max_length=3)),
+                ('deleted_at', models.DateTimeField(db_index=True)),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timetable_tombstones', to='subjects.subject')),
+            ],
+            options={
+                'unique_together': {('subject', 'day_of_week')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.10 on 2026-10-18 20:57
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timetable', '0003_timetable_tombstone'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='timetable',
+            name='timetable_day_subject',
+        ),
+    ]
@@ -50,3 +50,26 @@ class Timetable(models.Model):
     def __str__(self):
         return f"{self.subject} - {self.get_day_of_week_display()}"
 
+
+
+class TimetableTombstone(models.Model):
+    """
+    A removed timetable day, one row per subject and weekday with the time
+    of the last removal, for the change feed.
+    """
+    subject = models.ForeignKey(
+        Subject,
+        on_delete=models.CASCADE,
+        related_name="timetable_tombstones"
+    )
+    day_of_week = models.CharField(
+        max_length=3,
+        choices=Timetable.DayOfWeek.choices
+    )
+    deleted_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ("subject", "day_of_week")
+
+    def __str__(self):
+        return f"{self.subject} - {self.day_of_week} deleted {self.deleted_at}"
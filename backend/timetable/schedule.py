@@ -0,0 +1,133 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import Timetable
+
+# calendar order, Timetable.Meta.ordering sorts the codes alphabetically
+WEEK = [day.value for day in Timetable.DayOfWeek]
+DAY_LABELS = dict(Timetable.DayOfWeek.choices)
+
+
+def schedule_key(user_id):
+    return f"timetable:week:{user_id}"
+
+
+def _slot_sort_key(slot):
+    # timed slots first in time order, then the ones without a time
+    return (slot["start_time"] is None, slot["start_time"] or "", slot["subject_name"])
+
+
+def build_week(user_id):
+    """
+    The user's whole week from one query:
+    {"days": {"MON": [slot, ...], ...}, "version": "<hash>"}
+    Slots are plain dicts ordered by start time, ready to send as JSON.
+    """
+    return week_from_rows(_week_rows(user_id))
+
+
+def _week_rows(user_id):
+    return Timetable.objects.filter(subject__owner_id=user_id).order_by().values(
+        "id", "subject_id", "subject__subject_name", "day_of_week", "start_time", "end_time"
+    )
+
+
+def week_from_rows(rows):
+    # rows are dicts shaped like _week_rows(); callers that already hold the
+    # Timetable objects (e.g. prefetched) can build the same week without a query
+    days = {day: [] for day in WEEK}
+    for row in rows:
+        days[row["day_of_week"]].append({
+            "id": row["id"],
+            "subject": row["subject_id"],
+            "subject_name": row["subject__subject_name"],
+            "day_of_week": row["day_of_week"],
+            "day_label": DAY_LABELS[row["day_of_week"]],
+            "start_time": row["start_time"].isoformat() if row["start_time"] else None,
+            "end_time": row["end_time"].isoformat() if row["end_time"] else None,
+        })
+    for slots in days.values():
+        slots.sort(key=_slot_sort_key)
+
+    version = hashlib.sha256(json.dumps(days, sort_keys=True).encode()).hexdigest()[:16]
+    return {"days": days, "version": version}
+
+
+def get_week(user_id):
+    week = cache.get(schedule_key(user_id))
+    if week is None:
+        week = build_week(user_id)
+        cache.set(schedule_key(user_id), week, timeout=settings.CACHE_TTL)
+    return week
+
+
+def invalidate_week(user_id):
+    if user_id is None:
+        return
+    # after commit, so a concurrent read cannot cache the old week again
+    transaction.on_commit(lambda: cache.delete(schedule_key(user_id)))
+
+
+def user_timezone(request):
+    """
+    ?tz=Asia/Kolkata; falls back to settings.TIME_ZONE.
+    """
+    name = request.query_params.get("tz") or settings.TIME_ZONE
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValidationError({"tz": [f"Unknown time zone '{name}'."]})
+
+
+def local_now(tz):
+    return timezone.now().astimezone(tz)
+
+
+def day_code(moment):
+    return WEEK[moment.weekday()]
+
+
+def next_class(week, now):
+    """
+    First timed slot starting after now, looking up to a week ahead.
+    Returns {"date", "slot"} or None when nothing in the week has a time.
+    """
+    current_time = now.time().replace(microsecond=0).isoformat()
+    for offset in range(8):
+        day = now.date() + timedelta(days=offset)
+        for slot in week["days"][WEEK[day.weekday()]]:
+            if slot["start_time"] is None:
+                continue
+            if offset == 0 and slot["start_time"] <= current_time:
+                continue
+            return {"date": day.isoformat(), "slot": slot}
+    return None
+
+
+def starts_at(date_str, slot, tz):
+    # absolute start of a slot, handy for clients that schedule reminders
+    start = datetime.fromisoformat(f"{date_str}T{slot['start_time']}")
+    return start.replace(tzinfo=tz).isoformat()
+
+
+def next_class_payload(week, now):
+    """
+    The "next" object of the next-class endpoint: the slot plus its date
+    and absolute start, or None.
+    """
+    upcoming = next_class(week, now)
+    if upcoming is None:
+        return None
+    return {
+        **upcoming["slot"],
+        "date": upcoming["date"],
+        "starts_at": starts_at(upcoming["date"], upcoming["slot"], now.tzinfo),
+    }
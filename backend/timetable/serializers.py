@@ -18,4 +18,18 @@ class TimetableSerializer(serializers.ModelSerializer):
             "start_time",
             "end_time",
         ]
-        read_only_fields = ["id"]
\ No newline at end of file
+        read_only_fields = ["id"]
+
+class TimetableSlotSerializer(serializers.Serializer):
+    """
+    One slot of a bulk timetable sync: a weekday with optional times.
+    """
+    day_of_week = serializers.ChoiceField(choices=Timetable.DayOfWeek.choices)
+    start_time = serializers.TimeField(required=False, allow_null=True, default=None)
+    end_time = serializers.TimeField(required=False, allow_null=True, default=None)
+
+    def validate(self, attrs):
+        start, end = attrs["start_time"], attrs["end_time"]
+        if start and end and end <= start:
+            raise serializers.ValidationError({"end_time": "end_time must be after start_time"})
+        return attrs
@@ -0,0 +1,55 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Timetable, TimetableTombstone
+from .schedule import invalidate_week
+from .utils import bulk_delete
+from subjects.models import Subject
+
+
+def _owner_of(timetable):
+    if Timetable._meta.get_field("subject").is_cached(timetable):
+        return timetable.subject.owner_id
+    return (
+        Subject.objects.filter(id=timetable.subject_id)
+        .values_list("owner_id", flat=True)
+        .first()
+    )
+
+
+# bulk writes (sync_timetable) invalidate explicitly
+@receiver(post_save, sender=Timetable)
+def drop_week_on_timetable_save(sender, instance, **kwargs):
+    invalidate_week(_owner_of(instance))
+
+
+def _deletes_timetable(origin):
+    # origin is what delete() was called on; a deleted subject or user takes
+    # its tombstones with it, so only direct timetable deletes leave one
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is Timetable
+
+
+# deletes outside sync_timetable (admin, shell) drop the week and leave a
+# tombstone for the change feed; sync_timetable writes both once per batch
+@receiver(post_delete, sender=Timetable)
+def drop_week_on_timetable_delete(sender, instance, origin=None, **kwargs):
+    if bulk_delete.get():
+        return
+    invalidate_week(_owner_of(instance))
+    if _deletes_timetable(origin):
+        TimetableTombstone.objects.bulk_create(
+            [TimetableTombstone(subject_id=instance.subject_id, day_of_week=instance.day_of_week, deleted_at=timezone.now())],
+            update_conflicts=True,
+            unique_fields=["subject", "day_of_week"],
+            update_fields=["deleted_at"],
+        )
+
+
+# slots carry the subject name, and a deleted subject takes its slots with it
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def drop_week_on_subject_change(sender, instance, **kwargs):
+    invalidate_week(instance.owner_id)
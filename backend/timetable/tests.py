@@ -1,3 +1,208 @@
-from django.test import TestCase
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from .models import Timetable, TimetableTombstone
+from subjects.models import Subject
+
+User = get_user_model()
+
+
+class TimetableTestMixin:
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="student", password="pass12345", id_card_number="ID001"
+        )
+        self.client.force_authenticate(self.user)
+        self.subject = Subject.objects.create(subject_name="DBMS", owner=self.user)
+
+
+class ConditionalTimetableTests(TimetableTestMixin, APITestCase):
+    def test_subject_timetable_etag(self):
+        Timetable.objects.create(subject=self.subject, day_of_week="MON")
+        url = reverse("subject-timetable", args=[self.subject.id])
+
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Timetable.objects.create(subject=self.subject, day_of_week="TUE")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_today_classes_etag(self):
+        today_code = timezone.now().strftime("%a").upper()[:3]
+        Timetable.objects.create(subject=self.subject, day_of_week=today_code)
+        url = reverse("today-classes")
+
+        response = self.client.get(url)
+        self.assertEqual(len(response.json()), 1)
+        etag = response["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class AddTimetableTests(TimetableTestMixin, APITestCase):
+    def test_existing_day_is_updated(self):
+        Timetable.objects.create(subject=self.subject, day_of_week="MON", start_time="09:00")
+        url = reverse("add-timetable", args=[self.subject.id])
+
+        response = self.client.post(
+            url, {"subject": self.subject.id, "day_of_week": "MON", "start_time": "11:00"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        [slot] = Timetable.objects.filter(subject=self.subject)
+        self.assertEqual(str(slot.start_time), "11:00:00")
+
+        response = self.client.post(url, {"day_of_week": "XXX"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class BulkTimetableSyncTests(TimetableTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("bulk-add-timetable", args=[self.subject.id])
+
+    def week(self):
+        return {
+            row.day_of_week: (str(row.start_time), str(row.end_time))
+            for row in Timetable.objects.filter(subject=self.subject)
+        }
+
+    def test_slots_are_diffed_and_reported(self):
+        Timetable.objects.create(subject=self.subject, day_of_week="MON", start_time="09:00", end_time="10:00")
+        Timetable.objects.create(subject=self.subject, day_of_week="TUE", start_time="09:00", end_time="10:00")
+        Timetable.objects.create(subject=self.subject, day_of_week="WED", start_time="09:00", end_time="10:00")
+
+        response = self.client.post(self.url, {"slots": [
+            {"day_of_week": "MON", "start_time": "09:00", "end_time": "10:00"},
+            {"day_of_week": "TUE", "start_time": "11:00", "end_time": "12:00"},
+            {"day_of_week": "FRI", "start_time": "14:00", "end_time": "15:00"},
+        ]}, format="json")
+
+        data = response.json()
+        self.assertEqual(data["created"], ["FRI"])
+        self.assertEqual(data["updated"], ["TUE"])
+        self.assertEqual(data["deleted"], ["WED"])
+        self.assertEqual(data["unchanged"], ["MON"])
+        self.assertEqual(self.week(), {
+            "MON": ("09:00:00", "10:00:00"),
+            "TUE": ("11:00:00", "12:00:00"),
+            "FRI": ("14:00:00", "15:00:00"),
+        })
+
+    def test_query_count_does_not_grow_with_days(self):
+        slots = [{"day_of_week": day} for day in ("MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN")]
+        # subject, savepoint, read, upsert, release (nothing to delete)
+        with self.assertNumQueries(5):
+            self.client.post(self.url, {"slots": slots}, format="json")
+        self.assertEqual(Timetable.objects.filter(subject=self.subject).count(), 7)
+
+    def test_day_list_keeps_existing_times(self):
+        Timetable.objects.create(subject=self.subject, day_of_week="MON", start_time="09:00", end_time="10:00")
+        self.client.post(self.url, {"days": ["MON", "WED"]}, format="json")
+        self.assertEqual(self.week()["MON"], ("09:00:00", "10:00:00"))
+        self.assertIn("WED", self.week())
+
+    def test_invalid_payloads(self):
+        for payload in (
+            {"days": []},
+            {"slots": [{"day_of_week": "XYZ"}]},
+            {"slots": [{"day_of_week": "MON"}, {"day_of_week": "MON"}]},
+            {"slots": [{"day_of_week": "MON", "start_time": "10:00", "end_time": "09:00"}]},
+        ):
+            with self.subTest(payload):
+                self.assertEqual(self.client.post(self.url, payload, format="json").status_code, 400)
+
+
+class WeeklyScheduleTests(TimetableTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.os = Subject.objects.create(subject_name="OS", owner=self.user)
+        Timetable.objects.create(subject=self.subject, day_of_week="MON", start_time="11:00", end_time="12:00")
+        Timetable.objects.create(subject=self.os, day_of_week="MON", start_time="09:00", end_time="10:00")
+        Timetable.objects.create(subject=self.os, day_of_week="WED")
+        Timetable.objects.create(subject=self.subject, day_of_week="FRI", start_time="14:00", end_time="15:00")
+
+    def at(self, *args):
+        # freeze "now"; 2026-01-05 is a Monday
+        moment = datetime(*args, tzinfo=dt_timezone.utc)
+        return mock.patch("timetable.schedule.timezone.now", return_value=moment)
+
+    def test_week_is_time_ordered_and_cached(self):
+        with self.at(2026, 1, 5, 8, 0):
+            data = self.client.get(reverse("week-schedule")).json()
+            with self.assertNumQueries(0):
+                self.client.get(reverse("week-schedule"))
+
+        self.assertEqual(data["today"], "MON")
+        self.assertEqual(
+            [slot["subject_name"] for slot in data["days"]["MON"]], ["OS", "DBMS"]
+        )
+        self.assertEqual(data["days"]["TUE"], [])
+
+    def test_today_uses_user_timezone(self):
+        # 20:00 UTC Monday is already Tuesday 01:30 in Kolkata
+        with self.at(2026, 1, 5, 20, 0):
+            utc = self.client.get(reverse("today-classes")).json()
+            kolkata = self.client.get(reverse("today-classes"), {"tz": "Asia/Kolkata"}).json()
+
+        self.assertEqual(len(utc), 2)
+        self.assertEqual(kolkata, [])
+        self.assertEqual(
+            self.client.get(reverse("today-classes"), {"tz": "Mars/Base"}).status_code, 400
+        )
+
+    def test_next_class(self):
+        with self.at(2026, 1, 5, 9, 30):
+            upcoming = self.client.get(reverse("next-class")).json()["next"]
+        self.assertEqual((upcoming["subject_name"], upcoming["date"]), ("DBMS", "2026-01-05"))
+
+        with self.at(2026, 1, 5, 12, 0):
+            upcoming = self.client.get(reverse("next-class")).json()["next"]
+        # WED has no time, so the next timed class is Friday
+        self.assertEqual((upcoming["day_of_week"], upcoming["date"]), ("FRI", "2026-01-09"))
+        self.assertEqual(upcoming["starts_at"], "2026-01-09T14:00:00+00:00")
+
+    def test_index_invalidated_on_writes(self):
+        url = reverse("week-schedule")
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("bulk-add-timetable", args=[self.os.id]),
+                {"slots": [{"day_of_week": "THU", "start_time": "08:00"}]},
+                format="json",
+            )
+        days = self.client.get(url).json()["days"]
+        self.assertEqual([slot["subject_name"] for slot in days["MON"]], ["DBMS"])
+        self.assertEqual(len(days["THU"]), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.subject.subject_name = "Databases"
+            self.subject.save()
+        self.assertEqual(self.client.get(url).json()["days"]["MON"][0]["subject_name"], "Databases")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.subject.delete()
+        self.assertEqual(self.client.get(url).json()["days"]["MON"], [])
+
+    def test_deletes_outside_sync_drop_the_week_and_leave_a_tombstone(self):
+        url = reverse("week-schedule")
+        self.client.get(url)
+
+        # what the admin's delete action does
+        with self.captureOnCommitCallbacks(execute=True):
+            Timetable.objects.filter(subject=self.subject, day_of_week="FRI").delete()
+        self.assertEqual(self.client.get(url).json()["days"]["FRI"], [])
+        self.assertTrue(
+            TimetableTombstone.objects.filter(subject=self.subject, day_of_week="FRI").exists()
+        )
+
+        # a deleted subject takes its slots and tombstones with it
+        with self.captureOnCommitCallbacks(execute=True):
+            self.os.delete()
+        self.assertFalse(TimetableTombstone.objects.filter(subject_id=self.os.id).exists())
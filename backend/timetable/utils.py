@@ -0,0 +1,82 @@
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Timetable, TimetableTombstone
+from .schedule import invalidate_week
+
+
+# set while sync_timetable deletes, which writes the tombstones itself
+bulk_delete = ContextVar("timetable_bulk_delete", default=False)
+
+
+def sync_timetable(subject, slots, keep_times=False):
+    """
+    Make the subject's timetable exactly match slots
+    ({day_of_week: (start_time, end_time)}) with one read, one bulk upsert
+    and one delete, all in a single transaction.
+
+    keep_times keeps the stored times of days that already exist (used by
+    the old "list of days" payload, which carries no times).
+
+    Returns {"created": [...], "updated": [...], "deleted": [...], "unchanged": [...]}
+    with day codes.
+    """
+    with transaction.atomic():
+        existing = {
+            day: (start, end)
+            for day, start, end in Timetable.objects.select_for_update()
+            .filter(subject=subject)
+            .order_by()
+            .values_list("day_of_week", "start_time", "end_time")
+        }
+
+        changes = {"created": [], "updated": [], "deleted": [], "unchanged": []}
+        to_write = []
+        for day, times in slots.items():
+            if day in existing and keep_times:
+                times = existing[day]
+            if day not in existing:
+                changes["created"].append(day)
+            elif existing[day] != times:
+                changes["updated"].append(day)
+            else:
+                changes["unchanged"].append(day)
+                continue
+            to_write.append(
+                Timetable(subject=subject, day_of_week=day, start_time=times[0], end_time=times[1])
+            )
+
+        changes["deleted"] = [day for day in existing if day not in slots]
+
+        if changes["deleted"]:
+            #tombstones and the week are written once below, not per row by the receiver
+            token = bulk_delete.set(True)
+            try:
+                Timetable.objects.filter(
+                    subject=subject, day_of_week__in=changes["deleted"]
+                ).delete()
+            finally:
+                bulk_delete.reset(token)
+            #other devices learn about removed days through the change feed
+            TimetableTombstone.objects.bulk_create(
+                [
+                    TimetableTombstone(subject=subject, day_of_week=day, deleted_at=timezone.now())
+                    for day in changes["deleted"]
+                ],
+                update_conflicts=True,
+                unique_fields=["subject", "day_of_week"],
+                update_fields=["deleted_at"],
+            )
+        if to_write:
+            Timetable.objects.bulk_create(
+                to_write,
+                update_conflicts=True,
+                unique_fields=["subject", "day_of_week"],
+                update_fields=["start_time", "end_time", "updated_at"],
+            )
+        if changes["deleted"] or to_write:
+            invalidate_week(subject.owner_id)
+
+    return changes
@@ -1,64 +1,84 @@
-from datetime import date
-
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
+from django.shortcuts import get_object_or_404
 
 from .models import Timetable
-from .serializers import TimetableSerializer
+from .serializers import TimetableSerializer, TimetableSlotSerializer
+from .schedule import day_code, get_week, local_now, next_class_payload, user_timezone
+from .utils import sync_timetable
 from subjects.models import Subject
+from subjects.ownership import check_subject_owner
+from backend.conditional import conditional_get, conditional_response
+from backend.db_routing import ReplicaRoutingMixin
 
 
-class BulkAddTimetableView(APIView):
+class BulkAddTimetableView(ReplicaRoutingMixin, APIView):
     """
-    Endpoint to save multiple days for a subject in one request.
-    Frontend sends a list of days (e.g., ["MON", "WED", "THU"]).
-    Backend will create missing entries and delete days not in the list.
+    Endpoint to save the whole week of a subject in one request.
+    Send full slots:
+        {"slots": [{"day_of_week": "MON", "start_time": "10:00", "end_time": "11:00"}, ...]}
+    or the older list of days (times of existing days are kept):
+        {"days": ["MON", "WED", "THU"]}
+    Days not in the request are deleted. The diff is applied with one read,
+    one bulk upsert and one delete inside a transaction, and the response
+    lists which days were created, updated, deleted or unchanged.
     """
     permission_classes = [IsAuthenticated]
 
     def post(self, request, subject_id):
-        subject = Subject.objects.get(id=subject_id, user=request.user)
-        days = request.data.get("days", [])
+        subject = get_object_or_404(Subject, id=subject_id, owner=request.user)
+
+        slots = request.data.get("slots")
+        keep_times = slots is None
+        if keep_times:
+            days = request.data.get("days", [])
+            if not isinstance(days, list):
+                days = []
+            slots = [{"day_of_week": day} for day in days]
 
-        if not isinstance(days, list) or not days:
+        if not isinstance(slots, list) or not slots:
             return Response(
                 {"detail": "Please provide a non-empty list of days."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Delete timetable entries that are not in the list
-        Timetable.objects.filter(subject=subject).exclude(day_of_week__in=days).delete()
+        serializer = TimetableSlotSerializer(data=slots, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        # Create missing entries
-        for day in days:
-            Timetable.objects.update_or_create(
-                subject=subject,
-                day_of_week=day
-            )
+        week = {}
+        for slot in serializer.validated_data:
+            if slot["day_of_week"] in week:
+                return Response(
+                    {"detail": f"{slot['day_of_week']} is listed more than once."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            week[slot["day_of_week"]] = (slot["start_time"], slot["end_time"])
+
+        changes = sync_timetable(subject, week, keep_times=keep_times)
 
         return Response(
-            {"detail": "Timetable updated successfully."},
+            {"detail": "Timetable updated successfully.", **changes},
             status=status.HTTP_200_OK
         )
 
 #If a DRF view defines only post(), opening its URL in the browser sends a GET request, 
 # which results in the Browsable API form instead of JSON(like -- media type, content). 
 # This is expected behavior and not an error.
-class AddTimetableView(APIView):
+class AddTimetableView(ReplicaRoutingMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, subject_id):
-        subject = Subject.objects.get(
-            id=subject_id,
-            user=request.user
-        )
+        subject_id = check_subject_owner(request.user, subject_id, for_write=True)
 
-        serializer = TimetableSerializer(data=request.data)
+        #the slot serializer has no unique (subject, day) validator, so posting a
+        #day the subject already has updates its times instead of failing
+        serializer = TimetableSlotSerializer(data=request.data)
         if serializer.is_valid():
             Timetable.objects.update_or_create(
-                subject=subject,
+                subject_id=subject_id,
                 day_of_week=serializer.validated_data["day_of_week"],
                 defaults={
                     "start_time": serializer.validated_data.get("start_time"),
@@ -75,31 +95,72 @@ class AddTimetableView(APIView):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class SubjectTimetableView(APIView):
+class SubjectTimetableView(ReplicaRoutingMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, subject_id):
-        subject = Subject.objects.get(
-            id=subject_id,
-            user=request.user
+        check_subject_owner(request.user, subject_id)
+
+        timetable = Timetable.objects.filter(subject_id=subject_id)
+
+        #polled by the frontend; an unchanged timetable is answered with a 304
+        return conditional_get(
+            request,
+            timetable,
+            lambda: Response(
+                TimetableSerializer(timetable, many=True).data,
+                status=status.HTTP_200_OK,
+            ),
         )
 
-        timetable = Timetable.objects.filter(subject=subject)
-        serializer = TimetableSerializer(timetable, many=True)
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+#today / week / next class are all answered from the cached weekly index
+#(one query when the cache is cold, none after that) in the user's time zone
+#pass ?tz=Asia/Kolkata, default is settings.TIME_ZONE
+class TodayClassesView(ReplicaRoutingMixin, APIView):
+    permission_classes = [IsAuthenticated]
 
+    def get(self, request):
+        tz = user_timezone(request)
+        today_code = day_code(local_now(tz))
+        week = get_week(request.user.id)
+
+        #the weekday is part of the ETag so yesterday's copy never matches today
+        return conditional_response(
+            request,
+            lambda: Response(week["days"][today_code], status=status.HTTP_200_OK),
+            None,
+            today_code,
+            week["version"],
+        )
 
-class TodayClassesView(APIView):
+
+class WeekScheduleView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        today_code = date.today().strftime("%a").upper()[:3]
-
-        timetable = Timetable.objects.filter(
-            subject__user=request.user,
-            day_of_week=today_code
+        tz = user_timezone(request)
+        today_code = day_code(local_now(tz))
+        week = get_week(request.user.id)
+
+        return conditional_response(
+            request,
+            lambda: Response(
+                {"timezone": str(tz), "today": today_code, "days": week["days"]},
+                status=status.HTTP_200_OK,
+            ),
+            None,
+            today_code,
+            week["version"],
         )
 
-        serializer = TimetableSerializer(timetable, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+
+class NextClassView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        now = local_now(user_timezone(request))
+        return Response(
+            {"next": next_class_payload(get_week(request.user.id), now)},
+            status=status.HTTP_200_OK,
+        )